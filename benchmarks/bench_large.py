@@ -0,0 +1,97 @@
+"""
+Time reductions, argmax, isfinite and casts on arrays with more than 2**31
+elements.
+
+The arrays are memory-mapped sparse files in DIR (a new temporary
+directory by default), like the arrays of numtypes/tests/test_large.py.
+The time per element is reported, so runs with different sizes can be
+compared.  The files are deleted when the benchmark is done.
+
+    python benchmarks/bench_large.py [--size N] [--dir DIR] [--json FILE]
+                                     [TYPE ...]
+
+The default size is 2**31 + 16.  The first timing of each array includes
+reading the file into the page cache, so each operation is run twice and
+the second time is reported.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import numpy as np
+import numtypes
+
+
+type_names = ['nint32', 'polarcomplex64', 'polarcomplex128',
+              'logpolarcomplex64', 'logpolarcomplex128',
+              'logfloat16', 'logfloat32', 'logfloat64',
+              'slogfloat32', 'slogfloat64']
+
+
+def operations(typ, out_dir, size):
+    # Return a dict of name: function pairs; each function takes the
+    # array.
+    ops = {}
+    if typ in (numtypes.nint32, numtypes.polarcomplex64,
+               numtypes.polarcomplex128):
+        ops['add.reduce'] = np.add.reduce
+    else:
+        ops['multiply.reduce'] = np.multiply.reduce
+    if typ not in (numtypes.polarcomplex64, numtypes.polarcomplex128,
+                   numtypes.logpolarcomplex64, numtypes.logpolarcomplex128):
+        ops['argmax'] = np.argmax
+    if typ not in (numtypes.nint32, numtypes.polarcomplex64,
+                   numtypes.polarcomplex128, numtypes.logpolarcomplex64,
+                   numtypes.logpolarcomplex128):
+        def isfinite(a):
+            out = np.memmap(os.path.join(out_dir, 'out.dat'), dtype=bool,
+                            mode='w+', shape=(size,))
+            np.isfinite(a, out=out)
+            del out
+        ops['isfinite'] = isfinite
+    return ops
+
+
+def time_operation(func, a, repeat=2):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(a)
+        times.append(time.perf_counter() - start)
+    return times[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('types', nargs='*', metavar='TYPE',
+                        help='the types to time (default: all)')
+    parser.add_argument('--size', type=int, default=2**31 + 16,
+                        help='number of elements (default 2**31 + 16)')
+    parser.add_argument('--dir', help='directory for the sparse files')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'type':20} {'operation':16} {'time (s)':>10} {'ns/element':>11}")
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmpdir:
+        path = os.path.join(tmpdir, 'large.dat')
+        for name in args.types or type_names:
+            typ = getattr(numtypes, name)
+            a = np.memmap(path, dtype=typ, mode='w+', shape=(args.size,))
+            for op, func in operations(typ, tmpdir, args.size).items():
+                t = time_operation(func, a)
+                results[f'{name} {op}'] = {'size': args.size, 'time': t}
+                print(f'{name:20} {op:16} {t:10.2f} {1e9*t/args.size:11.3f}')
+            del a
+            for f in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, f))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
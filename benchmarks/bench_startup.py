@@ -0,0 +1,63 @@
+"""
+Measure the time to start Python and import numtypes.
+
+Each statement is run in a new interpreter (so nothing is cached in
+sys.modules), and the best and median wall clock times of the runs are
+reported.  The time of a bare interpreter start is shown for reference.
+
+    python benchmarks/bench_startup.py [--repeat N] [--json FILE]
+
+With --json, the results (in milliseconds) are also written to FILE, so
+they can be compared across commits.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+statements = {
+    'python': 'pass',
+    'numpy': 'import numpy',
+    'numtypes': 'import numtypes',
+    'logfloat': 'from numtypes import logfloat',
+    'nint32': 'from numtypes import nint32',
+    'logfloat64': 'from numtypes import logfloat64',
+    'polarcomplex128': 'from numtypes import polarcomplex128',
+    'all': 'from numtypes import *',
+}
+
+
+def time_statement(stmt, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', stmt], check=True)
+        times.append(1000*(time.perf_counter() - start))
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='number of runs of each statement (default 20)')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'statement':40} {'best (ms)':>10} {'median (ms)':>12}")
+    for name, stmt in statements.items():
+        best, median = time_statement(stmt, args.repeat)
+        results[name] = {'statement': stmt, 'best': best, 'median': median}
+        print(f'{stmt:40} {best:10.1f} {median:12.1f}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
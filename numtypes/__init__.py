@@ -1,16 +1,82 @@
+"""
+Custom data types for NumPy.
 
-from ._nint import nint32
-from ._polarcomplex import polarcomplex64, polarcomplex128
+The types and functions are imported from the extension modules when they
+are first used, so importing numtypes is fast, and ``from numtypes import
+logfloat`` doesn't import NumPy at all.
+"""
 
-# logfloat is a Python-only type.  It is not connected to NumPy
-from ._python_logtypes import logfloat
-
-# logfloat32 and logfloat64 are NumPy data types.
-from ._logtypes import logfloat32, logfloat64
+import importlib
+import os
 
 from ._version import __version__
 
 
-__all__ = ['nint32', 'polarcomplex64', 'polarcomplex128',
-           'logfloat', 'logfloat32', 'logfloat64',
-           '__version__']
+# The submodule that defines each attribute of the package.
+_attribute_modules = {
+    'nint32': '_nint',
+    'get_nint32_cast_policy': '_nint',
+    'set_nint32_cast_policy': '_nint',
+    'nint32_unique': '_nint',
+    'nint32_value_counts': '_nint',
+    'nint32_groupby_sum': '_nint',
+    'parse_nint32': '_nint',
+    'format_nint32': '_nint',
+    'take_nullable': '_nint',
+    'polarcomplex64': '_polarcomplex',
+    'polarcomplex128': '_polarcomplex',
+    'polar_angle': '_polarcomplex',
+    'polar_fields': '_polarcomplex',
+    'get_polarcomplex_add_precision': '_polarcomplex',
+    'set_polarcomplex_add_precision': '_polarcomplex',
+    'logpolarcomplex64': '_logpolarcomplex',
+    'logpolarcomplex128': '_logpolarcomplex',
+    # logfloat is a Python-only type.  It doesn't import NumPy.
+    'logfloat': '_python_logtypes',
+    # logfloat16, logfloat32 and logfloat64 are NumPy data types.
+    'logfloat16': '_logtypes',
+    'logfloat32': '_logtypes',
+    'logfloat64': '_logtypes',
+    'get_logadd_precision': '_logtypes',
+    'set_logadd_precision': '_logtypes',
+    # slogfloat32 and slogfloat64 are signed versions of the logfloat types.
+    'slogfloat32': '_slogtypes',
+    'slogfloat64': '_slogtypes',
+}
+
+
+__all__ = ['nint32', 'get_nint32_cast_policy', 'set_nint32_cast_policy',
+           'nint32_unique', 'nint32_value_counts', 'nint32_groupby_sum',
+           'parse_nint32', 'format_nint32', 'take_nullable',
+           'polarcomplex64', 'polarcomplex128', 'polar_angle', 'polar_fields',
+           'get_polarcomplex_add_precision', 'set_polarcomplex_add_precision',
+           'logpolarcomplex64', 'logpolarcomplex128',
+           'logfloat', 'logfloat16', 'logfloat32', 'logfloat64',
+           'get_logadd_precision', 'set_logadd_precision',
+           'slogfloat32', 'slogfloat64',
+           'get_include', '__version__']
+
+
+def get_include():
+    """
+    Return the directory of the header of the numtypes C API.
+
+    Extension modules that use the C API (numtypes/numtypes_api.h, or the
+    Cython declarations in numtypes/capi.pxd) need this directory and
+    ``numpy.get_include()`` in their include path.
+    """
+    return os.path.join(os.path.dirname(__file__), 'include')
+
+
+def __getattr__(name):
+    module_name = _attribute_modules.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    # Cache the value, so __getattr__ is not called again for this name.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_attribute_modules))
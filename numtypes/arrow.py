@@ -0,0 +1,81 @@
+"""
+Exchange nint32 arrays with Arrow-based libraries.
+
+The functions in this module use the Arrow PyCapsule interface, so they
+work with any library that implements it (e.g. pyarrow, polars, nanoarrow).
+No Arrow library is required by numtypes.
+
+An nint32 array is exported as an Arrow int32 array.  The values buffer
+of the Arrow array is the memory of the NumPy array (no copy is made),
+and the validity bitmap marks the nint32('nan') values as null.  Arrow
+requires contiguous values, so an array that is not C-contiguous (e.g.
+``a[::2]``) is copied, and the Arrow array shares the memory of the copy.  When an
+Arrow int32 array is imported, the values are copied into a new nint32
+array, and the null slots are set to nint32('nan').  (A valid value of
+-2**31 in the Arrow array also becomes nint32('nan').)
+"""
+
+import numpy as np
+from ._nint import nint32, _arrow_c_schema, _arrow_c_array, _arrow_c_import
+
+
+__all__ = ['NInt32ArrowArray', 'to_arrow', 'from_arrow']
+
+
+class NInt32ArrowArray:
+    """
+    Wrapper of a one-dimensional nint32 array that implements the
+    Arrow PyCapsule interface.
+
+    Instances are usually created with `to_arrow`.  The wrapped array
+    is available as the attribute `values`.  It is `values` itself if
+    that is a C-contiguous nint32 array, and a contiguous copy otherwise.
+    """
+
+    def __init__(self, values):
+        values = np.ascontiguousarray(values)
+        if values.dtype != nint32:
+            raise TypeError(f'expected an array with dtype nint32, '
+                            f'got {values.dtype}')
+        if values.ndim != 1:
+            raise ValueError(f'expected a one-dimensional array, got an '
+                             f'array with ndim={values.ndim}')
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __arrow_c_schema__(self):
+        return _arrow_c_schema()
+
+    def __arrow_c_array__(self, requested_schema=None):
+        # requested_schema is only a hint, so it is ignored.
+        return _arrow_c_array(self.values)
+
+
+def to_arrow(a):
+    """
+    Wrap the nint32 array `a` in an object that implements the Arrow
+    PyCapsule interface.
+
+    For example, if `a` is an nint32 array, `pyarrow.array(to_arrow(a))`
+    creates a pyarrow Int32Array that shares the memory of `a`.  If `a`
+    is not C-contiguous, it is copied, and the Arrow array shares the
+    memory of the copy.
+    """
+    return NInt32ArrowArray(a)
+
+
+def from_arrow(obj):
+    """
+    Create an nint32 array from an object that implements the Arrow
+    PyCapsule interface for arrays (i.e. that has the method
+    `__arrow_c_array__`) and holds int32 data.
+
+    The null values of `obj` become nint32('nan').
+    """
+    if not hasattr(obj, '__arrow_c_array__'):
+        raise TypeError(f"'{type(obj).__name__}' object does not implement "
+                        "the Arrow PyCapsule interface (__arrow_c_array__)")
+    schema_capsule, array_capsule = obj.__arrow_c_array__()
+    return _arrow_c_import(schema_capsule, array_capsule)
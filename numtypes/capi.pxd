@@ -0,0 +1,143 @@
+# Cython declarations of the numtypes C API (numtypes/numtypes_api.h).
+#
+# Use it with
+#
+#     from numtypes cimport capi
+#
+#     capi.import_numtypes()
+#     ...
+#     s = capi.numtypes_logtypes_api.logfloat64_log_add(x, y)
+#
+# and add numtypes.get_include() and numpy.get_include() to the include
+# directories of the extension.
+
+from cpython.object cimport PyTypeObject
+from libc.stdint cimport int32_t
+from numpy cimport npy_intp
+
+
+cdef extern from "<stdbool.h>":
+    ctypedef bint bool
+
+
+cdef extern from "numpy/ndarraytypes.h":
+    ctypedef struct PyArray_Descr:
+        pass
+
+
+cdef extern from "numtypes/numtypes_api.h":
+    int NUMTYPES_API_VERSION
+    int32_t NUMTYPES_NINT32_NAN
+
+    ctypedef struct numtypes_polarcomplex64:
+        float r
+        float theta
+
+    ctypedef struct numtypes_polarcomplex128:
+        double r
+        double theta
+
+    ctypedef void (*numtypes_strided_loop)(char **args,
+                                           const npy_intp *dimensions,
+                                           const npy_intp *steps,
+                                           void *data) noexcept nogil
+
+    ctypedef struct NumTypes_NInt32_API:
+        unsigned int version
+        PyTypeObject *type
+        PyArray_Descr *descr
+        int type_num
+        object (*box)(int32_t value)
+        int (*unbox)(object obj, int32_t *value) except -1
+        int32_t (*add)(int32_t x, int32_t y, bool *overflow) noexcept nogil
+        int32_t (*subtract)(int32_t x, int32_t y, bool *overflow) noexcept nogil
+        int32_t (*multiply)(int32_t x, int32_t y, bool *overflow) noexcept nogil
+        int32_t (*floor_divide)(int32_t x, int32_t y,
+                                bool *zero_division) noexcept nogil
+        int32_t (*minimum)(int32_t x, int32_t y) noexcept nogil
+        int32_t (*maximum)(int32_t x, int32_t y) noexcept nogil
+        numtypes_strided_loop add_loop
+        numtypes_strided_loop subtract_loop
+        numtypes_strided_loop multiply_loop
+        numtypes_strided_loop floor_divide_loop
+        numtypes_strided_loop minimum_loop
+        numtypes_strided_loop maximum_loop
+
+    ctypedef struct NumTypes_PolarComplex_API:
+        unsigned int version
+        PyTypeObject *polarcomplex64_type
+        PyTypeObject *polarcomplex128_type
+        PyArray_Descr *polarcomplex64_descr
+        PyArray_Descr *polarcomplex128_descr
+        int polarcomplex64_type_num
+        int polarcomplex128_type_num
+        object (*polarcomplex64_box)(numtypes_polarcomplex64 z)
+        object (*polarcomplex128_box)(numtypes_polarcomplex128 z)
+        int (*unbox)(object obj, numtypes_polarcomplex128 *z) except -1
+        numtypes_polarcomplex64 (*polarcomplex64_add)(
+            numtypes_polarcomplex64 z1, numtypes_polarcomplex64 z2) noexcept nogil
+        numtypes_polarcomplex64 (*polarcomplex64_subtract)(
+            numtypes_polarcomplex64 z1, numtypes_polarcomplex64 z2) noexcept nogil
+        numtypes_polarcomplex64 (*polarcomplex64_multiply)(
+            numtypes_polarcomplex64 z1, numtypes_polarcomplex64 z2) noexcept nogil
+        numtypes_polarcomplex64 (*polarcomplex64_divide)(
+            numtypes_polarcomplex64 z1, numtypes_polarcomplex64 z2) noexcept nogil
+        numtypes_polarcomplex128 (*polarcomplex128_add)(
+            numtypes_polarcomplex128 z1, numtypes_polarcomplex128 z2) noexcept nogil
+        numtypes_polarcomplex128 (*polarcomplex128_subtract)(
+            numtypes_polarcomplex128 z1, numtypes_polarcomplex128 z2) noexcept nogil
+        numtypes_polarcomplex128 (*polarcomplex128_multiply)(
+            numtypes_polarcomplex128 z1, numtypes_polarcomplex128 z2) noexcept nogil
+        numtypes_polarcomplex128 (*polarcomplex128_divide)(
+            numtypes_polarcomplex128 z1, numtypes_polarcomplex128 z2) noexcept nogil
+        numtypes_strided_loop polarcomplex64_add_loop
+        numtypes_strided_loop polarcomplex64_subtract_loop
+        numtypes_strided_loop polarcomplex64_multiply_loop
+        numtypes_strided_loop polarcomplex64_divide_loop
+        numtypes_strided_loop polarcomplex128_add_loop
+        numtypes_strided_loop polarcomplex128_subtract_loop
+        numtypes_strided_loop polarcomplex128_multiply_loop
+        numtypes_strided_loop polarcomplex128_divide_loop
+
+    ctypedef struct NumTypes_LogTypes_API:
+        unsigned int version
+        PyTypeObject *logfloat16_type
+        PyTypeObject *logfloat32_type
+        PyTypeObject *logfloat64_type
+        PyArray_Descr *logfloat16_descr
+        PyArray_Descr *logfloat32_descr
+        PyArray_Descr *logfloat64_descr
+        int logfloat16_type_num
+        int logfloat32_type_num
+        int logfloat64_type_num
+        object (*logfloat16_box)(double log)
+        object (*logfloat32_box)(double log)
+        object (*logfloat64_box)(double log)
+        int (*unbox)(object obj, double *log) except -1
+        float (*logfloat32_log_add)(float log1, float log2) noexcept nogil
+        float (*logfloat32_log_subtract)(float log1, float log2) noexcept nogil
+        float (*logfloat32_log_add_fast)(float log1, float log2) noexcept nogil
+        float (*logfloat32_log_subtract_fast)(float log1, float log2) noexcept nogil
+        double (*logfloat64_log_add)(double log1, double log2) noexcept nogil
+        double (*logfloat64_log_subtract)(double log1, double log2) noexcept nogil
+        double (*logfloat64_log_add_fast)(double log1, double log2) noexcept nogil
+        double (*logfloat64_log_subtract_fast)(double log1,
+                                               double log2) noexcept nogil
+        numtypes_strided_loop logfloat16_add_loop
+        numtypes_strided_loop logfloat16_subtract_loop
+        numtypes_strided_loop logfloat16_multiply_loop
+        numtypes_strided_loop logfloat16_true_divide_loop
+        numtypes_strided_loop logfloat32_add_loop
+        numtypes_strided_loop logfloat32_subtract_loop
+        numtypes_strided_loop logfloat32_multiply_loop
+        numtypes_strided_loop logfloat32_true_divide_loop
+        numtypes_strided_loop logfloat64_add_loop
+        numtypes_strided_loop logfloat64_subtract_loop
+        numtypes_strided_loop logfloat64_multiply_loop
+        numtypes_strided_loop logfloat64_true_divide_loop
+
+    const NumTypes_NInt32_API *numtypes_nint32_api
+    const NumTypes_PolarComplex_API *numtypes_polarcomplex_api
+    const NumTypes_LogTypes_API *numtypes_logtypes_api
+
+    int import_numtypes() except -1
@@ -0,0 +1,40 @@
+"""
+Hidden Markov model algorithms for arrays of the logfloat types.
+
+`forward`, `backward` and `viterbi` are generalized ufuncs that run the
+recursions over a whole sequence of observations in C::
+
+    forward(init, trans, emit)    (n),(n,n),(t,n)->(t,n)
+    backward(trans, emit)         (n,n),(t,n)->(t,n)
+    viterbi(init, trans, emit)    (n),(n,n),(t,n)->(t),()
+
+`init[j]` is the probability of starting in state j, `trans[i, j]` is the
+probability of the transition from state i to state j, and `emit[k, j]`
+is the probability of observation k in state j.  The arrays must have
+the same dtype, logfloat16, logfloat32 or logfloat64, and the leading
+dimensions are broadcast, so a batch of sequences (of the same length)
+is processed in one call.  The sums over the states are computed like
+``np.add.reduce``, with the precision set by `set_logadd_precision`.
+
+For example, the posterior probabilities of the states are
+
+    >>> import numpy as np
+    >>> from numtypes import logfloat64, hmm
+    >>> init = np.array([0.6, 0.4]).astype(logfloat64)
+    >>> trans = np.array([[0.7, 0.3], [0.4, 0.6]]).astype(logfloat64)
+    >>> emit = np.array([[0.5, 0.1], [0.4, 0.3], [0.1, 0.6]]).astype(logfloat64)
+    >>> alpha = hmm.forward(init, trans, emit)
+    >>> beta = hmm.backward(trans, emit)
+    >>> (alpha * beta / np.add.reduce(alpha[-1])).astype(float).round(4)
+    array([[0.8765, 0.1235],
+           [0.6229, 0.3771],
+           [0.2121, 0.7879]])
+    >>> path, p = hmm.viterbi(init, trans, emit)
+    >>> path
+    array([0, 0, 1])
+"""
+
+from ._logtypes import (hmm_forward as forward, hmm_backward as backward,
+                        hmm_viterbi as viterbi)
+
+__all__ = ['forward', 'backward', 'viterbi']
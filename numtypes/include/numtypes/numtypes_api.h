@@ -0,0 +1,246 @@
+//
+//  The numtypes C API.
+//
+//  Each numtypes extension module that defines NumPy dtypes exports a
+//  table of pointers to its type objects, dtype descriptors, scalar
+//  kernels, strided (ufunc inner loop) kernels, and functions to box and
+//  unbox the scalars, in a PyCapsule named "<module>._C_API":
+//
+//      numtypes._nint._C_API          NumTypes_NInt32_API
+//      numtypes._polarcomplex._C_API  NumTypes_PolarComplex_API
+//      numtypes._logtypes._C_API      NumTypes_LogTypes_API
+//
+//  An extension module that uses the API includes this header (after the
+//  NumPy headers), calls import_numtypes() in its module initialization,
+//  like NumPy's import_array(), and then uses the tables through the
+//  pointers numtypes_nint32_api, numtypes_polarcomplex_api and
+//  numtypes_logtypes_api, e.g.
+//
+//      double s = numtypes_logtypes_api->logfloat64_log_add(x, y);
+//
+//  The compiler flags for the header are given by numtypes.get_include()
+//  (and numpy.get_include()).  The pointers are static, so each C file
+//  that uses them calls import_numtypes().
+//
+//  The kernels are the functions that the ufunc loops and the scalar
+//  types use.  The strided kernels have the signature of ufunc inner
+//  loops (the `data` argument is not used, and can be NULL); like the
+//  ufunc loops, the nint32 loops set a Python exception on overflow or
+//  division by zero (with the GIL acquired if necessary), so check
+//  PyErr_Occurred() after calling them.  The box functions return a new
+//  reference, or NULL with an exception set; the unbox functions accept
+//  the same objects as the constructors of the types, and return 0, or
+//  -1 with an exception set.  The type_num fields are the dtype numbers
+//  that NumPy assigned to the types when they were registered.
+//
+//  The API is versioned: a new version only adds fields at the end of the
+//  tables, so a module compiled with this header works with any numtypes
+//  whose `version` is at least NUMTYPES_API_VERSION.
+//
+
+#ifndef NUMTYPES_API_H
+#define NUMTYPES_API_H
+
+#include <Python.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include <numpy/ndarraytypes.h>
+
+#define NUMTYPES_API_VERSION 1
+
+// nint32 uses INT32_MIN to represent nan.
+#define NUMTYPES_NINT32_NAN INT32_MIN
+
+typedef struct {
+    float r;
+    float theta;
+} numtypes_polarcomplex64;
+
+typedef struct {
+    double r;
+    double theta;
+} numtypes_polarcomplex128;
+
+typedef void (*numtypes_strided_loop)(char **args, const npy_intp *dimensions,
+                                      const npy_intp *steps, void *data);
+
+typedef struct {
+    unsigned int version;
+    PyTypeObject *type;
+    PyArray_Descr *descr;
+    int type_num;
+    PyObject *(*box)(int32_t value);
+    int (*unbox)(PyObject *obj, int32_t *value);
+    // *overflow (or *zero_division) is set to true if the operation
+    // overflows (or divides by zero); otherwise it is not changed.
+    int32_t (*add)(int32_t x, int32_t y, bool *overflow);
+    int32_t (*subtract)(int32_t x, int32_t y, bool *overflow);
+    int32_t (*multiply)(int32_t x, int32_t y, bool *overflow);
+    int32_t (*floor_divide)(int32_t x, int32_t y, bool *zero_division);
+    int32_t (*minimum)(int32_t x, int32_t y);
+    int32_t (*maximum)(int32_t x, int32_t y);
+    numtypes_strided_loop add_loop;
+    numtypes_strided_loop subtract_loop;
+    numtypes_strided_loop multiply_loop;
+    numtypes_strided_loop floor_divide_loop;
+    numtypes_strided_loop minimum_loop;
+    numtypes_strided_loop maximum_loop;
+} NumTypes_NInt32_API;
+
+typedef struct {
+    unsigned int version;
+    PyTypeObject *polarcomplex64_type;
+    PyTypeObject *polarcomplex128_type;
+    PyArray_Descr *polarcomplex64_descr;
+    PyArray_Descr *polarcomplex128_descr;
+    int polarcomplex64_type_num;
+    int polarcomplex128_type_num;
+    PyObject *(*polarcomplex64_box)(numtypes_polarcomplex64 z);
+    PyObject *(*polarcomplex128_box)(numtypes_polarcomplex128 z);
+    // Unbox any polarcomplex scalar, a tuple (r, theta) or a complex number.
+    int (*unbox)(PyObject *obj, numtypes_polarcomplex128 *z);
+    numtypes_polarcomplex64 (*polarcomplex64_add)(numtypes_polarcomplex64 z1,
+                                                  numtypes_polarcomplex64 z2);
+    numtypes_polarcomplex64 (*polarcomplex64_subtract)(numtypes_polarcomplex64 z1,
+                                                       numtypes_polarcomplex64 z2);
+    numtypes_polarcomplex64 (*polarcomplex64_multiply)(numtypes_polarcomplex64 z1,
+                                                       numtypes_polarcomplex64 z2);
+    numtypes_polarcomplex64 (*polarcomplex64_divide)(numtypes_polarcomplex64 z1,
+                                                     numtypes_polarcomplex64 z2);
+    numtypes_polarcomplex128 (*polarcomplex128_add)(numtypes_polarcomplex128 z1,
+                                                    numtypes_polarcomplex128 z2);
+    numtypes_polarcomplex128 (*polarcomplex128_subtract)(numtypes_polarcomplex128 z1,
+                                                         numtypes_polarcomplex128 z2);
+    numtypes_polarcomplex128 (*polarcomplex128_multiply)(numtypes_polarcomplex128 z1,
+                                                         numtypes_polarcomplex128 z2);
+    numtypes_polarcomplex128 (*polarcomplex128_divide)(numtypes_polarcomplex128 z1,
+                                                       numtypes_polarcomplex128 z2);
+    // The add and subtract loops use set_polarcomplex_add_precision.
+    numtypes_strided_loop polarcomplex64_add_loop;
+    numtypes_strided_loop polarcomplex64_subtract_loop;
+    numtypes_strided_loop polarcomplex64_multiply_loop;
+    numtypes_strided_loop polarcomplex64_divide_loop;
+    numtypes_strided_loop polarcomplex128_add_loop;
+    numtypes_strided_loop polarcomplex128_subtract_loop;
+    numtypes_strided_loop polarcomplex128_multiply_loop;
+    numtypes_strided_loop polarcomplex128_divide_loop;
+} NumTypes_PolarComplex_API;
+
+typedef struct {
+    unsigned int version;
+    PyTypeObject *logfloat16_type;
+    PyTypeObject *logfloat32_type;
+    PyTypeObject *logfloat64_type;
+    PyArray_Descr *logfloat16_descr;
+    PyArray_Descr *logfloat32_descr;
+    PyArray_Descr *logfloat64_descr;
+    int logfloat16_type_num;
+    int logfloat32_type_num;
+    int logfloat64_type_num;
+    // The box functions take the log of the value (logfloat16 rounds it
+    // to half precision).
+    PyObject *(*logfloat16_box)(double log);
+    PyObject *(*logfloat32_box)(double log);
+    PyObject *(*logfloat64_box)(double log);
+    // Unbox the log of any logfloat scalar, or of a number.
+    int (*unbox)(PyObject *obj, double *log);
+    // log(exp(log1) + exp(log2)) and log(exp(log1) - exp(log2)).  The
+    // _fast versions are the approximations of set_logadd_precision('fast').
+    float (*logfloat32_log_add)(float log1, float log2);
+    float (*logfloat32_log_subtract)(float log1, float log2);
+    float (*logfloat32_log_add_fast)(float log1, float log2);
+    float (*logfloat32_log_subtract_fast)(float log1, float log2);
+    double (*logfloat64_log_add)(double log1, double log2);
+    double (*logfloat64_log_subtract)(double log1, double log2);
+    double (*logfloat64_log_add_fast)(double log1, double log2);
+    double (*logfloat64_log_subtract_fast)(double log1, double log2);
+    // The add and subtract loops use set_logadd_precision.
+    numtypes_strided_loop logfloat16_add_loop;
+    numtypes_strided_loop logfloat16_subtract_loop;
+    numtypes_strided_loop logfloat16_multiply_loop;
+    numtypes_strided_loop logfloat16_true_divide_loop;
+    numtypes_strided_loop logfloat32_add_loop;
+    numtypes_strided_loop logfloat32_subtract_loop;
+    numtypes_strided_loop logfloat32_multiply_loop;
+    numtypes_strided_loop logfloat32_true_divide_loop;
+    numtypes_strided_loop logfloat64_add_loop;
+    numtypes_strided_loop logfloat64_subtract_loop;
+    numtypes_strided_loop logfloat64_multiply_loop;
+    numtypes_strided_loop logfloat64_true_divide_loop;
+} NumTypes_LogTypes_API;
+
+
+// The numtypes modules define NUMTYPES_API_MODULE before including this
+// header; they fill in the tables instead of importing them.
+#ifndef NUMTYPES_API_MODULE
+
+static const NumTypes_NInt32_API *numtypes_nint32_api = NULL;
+static const NumTypes_PolarComplex_API *numtypes_polarcomplex_api = NULL;
+static const NumTypes_LogTypes_API *numtypes_logtypes_api = NULL;
+
+//
+// Return the table in the capsule _C_API (named capsule_name) of the
+// module module_name.
+// (PyCapsule_Import is not used, because it does not import the module
+// when its package is already imported, and the numtypes package imports
+// its extension modules lazily.)
+//
+static const void *
+numtypes_import_api(const char *module_name, const char *capsule_name)
+{
+    PyObject *module = PyImport_ImportModule(module_name);
+    if (module == NULL) {
+        return NULL;
+    }
+    PyObject *capsule = PyObject_GetAttrString(module, "_C_API");
+    Py_DECREF(module);
+    if (capsule == NULL) {
+        return NULL;
+    }
+    const unsigned int *version = (const unsigned int *)
+        PyCapsule_GetPointer(capsule, capsule_name);
+    Py_DECREF(capsule);
+    if (version == NULL) {
+        return NULL;
+    }
+    if (*version < NUMTYPES_API_VERSION) {
+        PyErr_Format(PyExc_ImportError,
+                     "%s has version %u of the numtypes C API, but this "
+                     "module was compiled for version %d",
+                     module_name, *version, NUMTYPES_API_VERSION);
+        return NULL;
+    }
+    return version;
+}
+
+//
+// Import the numtypes C API.  Return 0 on success, or -1 with an
+// exception set.
+//
+static int
+import_numtypes(void)
+{
+    numtypes_nint32_api = (const NumTypes_NInt32_API *)
+        numtypes_import_api("numtypes._nint",
+                            "numtypes._nint._C_API");
+    if (numtypes_nint32_api == NULL) {
+        return -1;
+    }
+    numtypes_polarcomplex_api = (const NumTypes_PolarComplex_API *)
+        numtypes_import_api("numtypes._polarcomplex",
+                            "numtypes._polarcomplex._C_API");
+    if (numtypes_polarcomplex_api == NULL) {
+        return -1;
+    }
+    numtypes_logtypes_api = (const NumTypes_LogTypes_API *)
+        numtypes_import_api("numtypes._logtypes",
+                            "numtypes._logtypes._C_API");
+    if (numtypes_logtypes_api == NULL) {
+        return -1;
+    }
+    return 0;
+}
+
+#endif
+
+#endif
@@ -0,0 +1,113 @@
+"""
+Save and load arrays with numtypes dtypes in NumPy's .npy format.
+
+The header of a .npy file can only describe NumPy's own dtypes, so
+`np.save` can't write an array whose dtype is, for example, nint32.
+`save` writes the memory of the array unchanged, and the header describes
+the data as a structured array with a single field.  The name of the field
+is the name of the numtypes dtype (e.g. 'numtypes.nint32'), and the dtype
+of the field is the storage layout of the type (e.g. int32 for nint32, or
+a pair of float64 fields for polarcomplex128).
+
+Any .npy reader can read such a file.  `load` recognizes the field name
+and returns a view of the data with the numtypes dtype, so no per-element
+conversion is done.  With `mmap_mode`, the result is a memory map of the
+file.  Data in the other byte order (e.g. a file written on a big-endian
+machine) is not converted; the result has a non-native descriptor such as
+``np.dtype(nint32).newbyteorder('>')``, which can be used like the native
+dtype.  Use ``arr.astype(typ)`` to get an array in native byte order.
+
+Arrays with numtypes dtypes (and the dtypes and scalars themselves) can
+also be pickled, e.g. to send them to multiprocessing workers.
+"""
+
+import numpy as np
+from ._nint import nint32
+from ._polarcomplex import polarcomplex64, polarcomplex128
+from ._logpolarcomplex import logpolarcomplex64, logpolarcomplex128
+from ._logtypes import logfloat16, logfloat32, logfloat64
+from ._slogtypes import slogfloat32, slogfloat64
+
+
+__all__ = ['save', 'load']
+
+
+def _sign_log_layout(ftype, itemsize):
+    return np.dtype({'names': ['log', 'sign'],
+                     'formats': [ftype, 'i1'],
+                     'offsets': [0, np.dtype(ftype).itemsize],
+                     'itemsize': itemsize})
+
+
+# The storage layout of each numtypes dtype.
+_storage_dtypes = {
+    nint32: np.dtype(np.int32),
+    logfloat16: np.dtype(np.float16),
+    logfloat32: np.dtype(np.float32),
+    logfloat64: np.dtype(np.float64),
+    slogfloat32: _sign_log_layout('f4', np.dtype(slogfloat32).itemsize),
+    slogfloat64: _sign_log_layout('f8', np.dtype(slogfloat64).itemsize),
+    polarcomplex64: np.dtype([('r', 'f4'), ('theta', 'f4')]),
+    polarcomplex128: np.dtype([('r', 'f8'), ('theta', 'f8')]),
+    logpolarcomplex64: np.dtype([('logr', 'f4'), ('theta', 'f4')]),
+    logpolarcomplex128: np.dtype([('logr', 'f8'), ('theta', 'f8')]),
+}
+
+def _byteorder(dt):
+    # The byte order of the first multibyte field of the storage dtype dt.
+    while dt.names is not None:
+        dt = dt[0]
+    return dt.byteorder
+
+
+_types_by_field_name = {f'numtypes.{typ.__name__}': typ
+                        for typ in _storage_dtypes}
+
+
+def save(file, arr):
+    """
+    Save an array to a file in NumPy .npy format.
+
+    If the dtype of `arr` is not a numtypes dtype, this is the same as
+    ``np.save(file, arr)``.  Otherwise the data is written as described
+    in the module docstring, and the array can be restored with `load`.
+    """
+    arr = np.asanyarray(arr)
+    storage = _storage_dtypes.get(arr.dtype.type)
+    if storage is not None:
+        if not arr.dtype.isnative:
+            storage = storage.newbyteorder('S')
+        field_name = f'numtypes.{arr.dtype.type.__name__}'
+        arr = arr.view(np.dtype([(field_name, storage)]))
+    np.save(file, arr, allow_pickle=False)
+
+
+def load(file, mmap_mode=None, allow_pickle=False):
+    """
+    Load an array from a .npy file.
+
+    The arguments are the same as those of `np.load`.  If the file was
+    written by `save` with an array that has a numtypes dtype, the array
+    returned has that dtype, with the byte order of the data in the file.
+    When `mmap_mode` is given, the returned array is a view of the memory
+    map of the file.
+    """
+    arr = np.load(file, mmap_mode=mmap_mode, allow_pickle=allow_pickle)
+    if not isinstance(arr, np.ndarray):
+        # An NpzFile; its members are loaded with np.load's rules.
+        return arr
+    names = arr.dtype.names
+    if names is None or len(names) != 1:
+        return arr
+    typ = _types_by_field_name.get(names[0])
+    if typ is None:
+        return arr
+    dtype = np.dtype(typ)
+    if _byteorder(arr.dtype[0]) not in ('=', '|'):
+        # A non-native byte order is always given explicitly as '<' or '>'.
+        dtype = dtype.newbyteorder('S')
+    if arr.dtype.itemsize != np.dtype(typ).itemsize:
+        raise ValueError(f'the data for {names[0]} in the file has itemsize '
+                         f'{arr.dtype.itemsize}, expected '
+                         f'{np.dtype(typ).itemsize}')
+    return arr.view(dtype)
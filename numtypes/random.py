@@ -0,0 +1,93 @@
+"""
+Random sampling with weights given by their logs.
+"""
+
+import operator
+import numpy as np
+from ._logtypes import logfloat16, logfloat32, logfloat64, _categorical
+
+__all__ = ['categorical']
+
+
+def categorical(log_weights, size=None, rng=None, axis=-1):
+    """
+    Draw samples of categorical distributions given by weights.
+
+    Parameters
+    ----------
+    log_weights : array_like
+        The weights of the categories, along `axis`.  An array of
+        logfloat16, logfloat32 or logfloat64 holds the weights; an array of
+        a builtin real type holds the logs of the weights.  The weights
+        don't have to be normalized, and they can be much smaller (or
+        larger) than the range of float64.  A weight of 0 (log -inf) is
+        never sampled.  nan and infinite weights are not allowed.
+    size : int or tuple of ints, optional
+        The number of samples (or the shape of the samples) drawn from
+        each distribution.  The default, None, draws one sample.
+    rng : numpy.random.Generator, optional
+        The random generator.  Anything accepted by
+        ``numpy.random.default_rng`` (such as a seed) is also accepted.
+    axis : int, optional
+        The axis of `log_weights` that holds the categories.  The other
+        axes are a batch of distributions.  The default is -1.
+
+    Returns
+    -------
+    samples : ndarray of intp
+        The indices of the sampled categories.  The shape is the shape of
+        `log_weights` without `axis`, followed by `size`.  (If the result
+        has no dimensions, a scalar is returned.)
+
+    Notes
+    -----
+    The samples are drawn by inverse transform sampling, with the uniform
+    variates generated in increasing order, so the weights of each
+    distribution are read twice and the time is proportional to the
+    number of categories plus the number of samples.  No array other than
+    the result is created (unless `log_weights` has to be converted to
+    float64), and the work is done without the GIL, holding the lock of
+    the bit generator.
+
+    Examples
+    --------
+    Resampling the particles of a particle filter, with weights far below
+    the range of float64:
+
+    >>> import numpy as np
+    >>> from numtypes import random
+    >>> log_w = np.array([-2000.0, -1999.0, -np.inf, -1998.5])
+    >>> idx = random.categorical(log_w, size=10, rng=np.random.default_rng(1))
+    >>> idx.shape
+    (10,)
+    >>> bool((idx != 2).all())
+    True
+    """
+    rng = np.random.default_rng(rng)
+    w = np.asarray(log_weights)
+    if w.dtype.type not in (logfloat16, logfloat32, logfloat64):
+        if not (w.dtype.isbuiltin and w.dtype.kind in 'biuf'):
+            raise TypeError('log_weights must be an array of a logfloat '
+                            f'type or of a real type, not {w.dtype}')
+        w = w.astype(np.float64, copy=False)
+    if w.ndim == 0:
+        raise ValueError('log_weights must have at least one dimension')
+    w = np.moveaxis(w, axis, -1)
+
+    if size is None:
+        shape = ()
+    elif np.ndim(size) == 0:
+        shape = (operator.index(size),)
+    else:
+        shape = tuple(operator.index(m) for m in size)
+    if any(m < 0 for m in shape):
+        raise ValueError('size must not be negative')
+
+    out = np.empty(w.shape[:-1] + shape, dtype=np.intp)
+    bitgen = rng.bit_generator
+    with bitgen.lock:
+        _categorical(w, out.reshape(w.shape[:-1] + (int(np.prod(shape)),)),
+                     bitgen.capsule)
+    if out.ndim == 0:
+        return out[()]
+    return out
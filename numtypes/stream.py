@@ -0,0 +1,366 @@
+"""
+Reductions and element-wise computations over data larger than memory.
+
+The functions in this module process a source of data in chunks of rows
+(slices along the first axis), so memory-mapped files much larger than
+the memory of the computer can be reduced or transformed with bounded
+memory use.  The source is either
+
+* an array, typically an `np.memmap` (or the result of
+  ``numtypes.npyio.load(file, mmap_mode='r')``), or
+* an iterable of arrays or of objects with the buffer protocol (such as
+  the bytes returned by reading a file in blocks); buffers are
+  interpreted as one-dimensional data with the given `dtype`, and values
+  may be split between consecutive buffers.
+
+Each chunk is copied into memory by a background thread, which reads the
+next chunk while the current one is processed, so the I/O overlaps with
+the computation.  At most three chunks (the one being processed, one
+waiting, and one being read) are in memory at once, and no chunk is
+larger than `max_bytes`.  Within that bound the chunk size adapts: it
+grows while processing a chunk takes less than about 0.1 seconds, and
+shrinks if it takes much longer.
+
+The reductions (`reduce`, `sum`, `max`, `min`, `nanmean` and `logsumexp`)
+are over the first axis.  They carry the partial result from chunk to
+chunk and pass it into the reduction of the next chunk, so when the
+reduction loop of the dtype is a sequential fold (as it is for nint32,
+logfloat32, logfloat64, the integer types, and for maximum and minimum),
+the result is identical, bit for bit, to the reduction of the whole array
+in memory.  NumPy's sums of float16, float32 and float64 use pairwise
+summation within a chunk, the logfloat sums with
+``set_logadd_precision('fast')`` use partial sums, and the logfloat16 sums
+keep the running sum in float32 within a chunk but round it to half
+precision between chunks, so those results can differ from the in-memory
+ones in the last bits.
+
+Element-wise computations (a chain of ufuncs, written as a function of a
+chunk) are applied with `apply`, or before a reduction with the `func`
+argument of the reductions.
+"""
+
+import contextlib
+import queue
+import threading
+import time
+import numpy as np
+from ._nint import nint32
+from ._logtypes import logfloat16, logfloat32, logfloat64
+
+
+__all__ = ['chunks', 'apply', 'reduce', 'sum', 'max', 'min', 'nanmean',
+           'logsumexp']
+
+
+# The default bound of the size of a chunk, in bytes.
+DEFAULT_MAX_BYTES = 64*2**20
+
+# The size of the first chunk, and the target time to process a chunk.
+_INITIAL_BYTES = 2**20
+_TARGET_SECONDS = 0.1
+
+_log_types = {np.float16: logfloat16, np.float32: logfloat32,
+              np.float64: logfloat64}
+
+
+class _ChunkSize:
+    # The size in bytes of the next chunk.  It is updated (by the thread
+    # that processes the chunks) with the time used to process the last
+    # chunk, and read by the thread that reads the chunks.
+
+    def __init__(self, max_bytes):
+        if max_bytes < 1:
+            raise ValueError('max_bytes must be positive')
+        self.max_bytes = max_bytes
+        self.nbytes = (_INITIAL_BYTES if _INITIAL_BYTES < max_bytes
+                       else max_bytes)
+
+    def rows(self, row_bytes):
+        n = self.nbytes // row_bytes if row_bytes > 0 else self.nbytes
+        return n if n > 1 else 1
+
+    def update(self, nbytes, seconds):
+        # nbytes is the size of the last chunk; a short chunk (e.g. the end
+        # of an item of an iterable source) doesn't make the chunks grow.
+        if seconds < _TARGET_SECONDS/2 and 2*nbytes > self.nbytes:
+            self.nbytes = 2*self.nbytes
+            if self.nbytes > self.max_bytes:
+                self.nbytes = self.max_bytes
+        elif seconds > 2*_TARGET_SECONDS and self.nbytes > 1:
+            self.nbytes = self.nbytes // 2
+
+
+def _read_array(arr, size):
+    row_bytes = arr.itemsize * (arr.size // len(arr) if len(arr) else 0)
+    start = 0
+    while start < len(arr):
+        stop = start + size.rows(row_bytes)
+        # Copying the rows reads them from the file of a memory map.
+        yield np.array(arr[start:stop])
+        start = stop
+
+
+def _read_iterable(items, dtype, size):
+    pending = b''
+    for item in items:
+        if isinstance(item, np.ndarray):
+            if pending:
+                raise ValueError('the buffers of the source end with a '
+                                 'partial value before an array')
+            a = item.reshape(1) if item.ndim == 0 else item
+        else:
+            if dtype is None:
+                raise TypeError('dtype must be given for a source of '
+                                'buffers')
+            itemsize = np.dtype(dtype).itemsize
+            data = memoryview(item).cast('B')
+            if pending:
+                data = memoryview(pending + data.tobytes())
+            n = len(data) - len(data) % itemsize
+            pending = data[n:].tobytes()
+            a = np.frombuffer(data[:n], dtype=dtype)
+        row_bytes = a.itemsize * (a.size // len(a) if len(a) else 0)
+        start = 0
+        while start < len(a):
+            stop = start + size.rows(row_bytes)
+            # The copy is needed because the source may reuse the buffer.
+            yield np.array(a[start:stop])
+            start = stop
+    if pending:
+        raise ValueError('the size of the data in the buffers of the source '
+                         'is not a multiple of the itemsize')
+
+
+def _readahead(chunk_iter):
+    # Run chunk_iter in a background thread, one chunk ahead.
+    q = queue.Queue(maxsize=1)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def run():
+        try:
+            for chunk in chunk_iter:
+                if not put((chunk, None)):
+                    return
+            put((None, None))
+        except BaseException as exc:
+            put((None, exc))
+        finally:
+            chunk_iter.close()
+
+    thread = threading.Thread(target=run, name='numtypes.stream readahead',
+                              daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk, exc = q.get()
+            if chunk is None:
+                if exc is not None:
+                    raise exc
+                return
+            yield chunk
+    finally:
+        stop.set()
+        thread.join()
+
+
+def chunks(source, *, dtype=None, max_bytes=DEFAULT_MAX_BYTES,
+           readahead=True):
+    """
+    Iterate over the data of `source` in chunks of rows.
+
+    `source` is an array (e.g. an `np.memmap`) or an iterable of arrays or
+    buffers, as described in the module docstring; `dtype` is the dtype of
+    the data in the buffers.  The chunks are arrays in memory (copies of
+    the data), with at most `max_bytes` bytes (but at least one row).  If
+    `readahead` is True, the next chunk is read in a background thread
+    while the current chunk is used.  The size of the chunks is adapted to
+    the time spent using each one.
+    """
+    size = _ChunkSize(max_bytes)
+    if isinstance(source, np.ndarray):
+        if source.ndim == 0:
+            raise ValueError('an array source must have at least one '
+                             'dimension')
+        chunk_iter = _read_array(source, size)
+    else:
+        chunk_iter = _read_iterable(iter(source), dtype, size)
+    if readahead:
+        chunk_iter = _readahead(chunk_iter)
+    with contextlib.closing(chunk_iter):
+        for chunk in chunk_iter:
+            start = time.perf_counter()
+            yield chunk
+            size.update(chunk.nbytes, time.perf_counter() - start)
+
+
+def _empty(source, dtype):
+    # An empty array with the dtype and row shape of source.
+    if isinstance(source, np.ndarray):
+        return source[:0]
+    if dtype is None:
+        raise ValueError('the source is empty, and dtype was not given')
+    return np.empty(0, dtype=dtype)
+
+
+def apply(func, source, out, *, dtype=None, max_bytes=DEFAULT_MAX_BYTES,
+          readahead=True):
+    """
+    Store ``func(chunk)`` in the corresponding rows of `out`, for the chunks
+    of `source`.
+
+    `func` is an element-wise computation, such as
+    ``lambda x: np.multiply(x, w, out=x)``; it may modify the chunk in
+    place.  `out` is an array with the length of the source, e.g. an
+    `np.memmap` opened for writing; if it is a memory map, it is flushed
+    at the end.  The other arguments are those of `chunks`.  Returns `out`.
+    """
+    start = 0
+    for chunk in chunks(source, dtype=dtype, max_bytes=max_bytes,
+                        readahead=readahead):
+        stop = start + len(chunk)
+        if stop > len(out):
+            raise ValueError('the source is longer than out')
+        out[start:stop] = func(chunk)
+        start = stop
+    if start != len(out):
+        raise ValueError(f'the source has {start} rows, but out has '
+                         f'{len(out)}')
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+
+def _fold(ufunc, acc, chunk):
+    # ufunc.reduce(chunk, axis=0), continued from the partial result acc.
+    if acc is None:
+        return ufunc.reduce(chunk, axis=0)
+    if chunk.ndim == 1:
+        return ufunc.reduce(chunk, axis=0, initial=acc)
+    return ufunc.reduce(np.concatenate([acc[np.newaxis], chunk]), axis=0)
+
+
+def reduce(ufunc, source, *, func=None, dtype=None,
+           max_bytes=DEFAULT_MAX_BYTES, readahead=True):
+    """
+    Reduce the data of `source` with ``ufunc.reduce`` along the first axis.
+
+    If `func` is given, the chunks are replaced by ``func(chunk)`` before
+    they are reduced.  The other arguments are those of `chunks`.  As
+    explained in the module docstring, the result is the same as
+    ``ufunc.reduce(func(arr), axis=0)`` for the whole array `arr` in
+    memory.
+    """
+    acc = None
+    for chunk in chunks(source, dtype=dtype, max_bytes=max_bytes,
+                        readahead=readahead):
+        acc = _fold(ufunc, acc, chunk if func is None else func(chunk))
+    if acc is None:
+        empty = _empty(source, dtype)
+        return ufunc.reduce(empty if func is None else func(empty), axis=0)
+    return acc
+
+
+def sum(source, **kwargs):
+    """
+    Sum the data of `source` along the first axis.
+
+    The keyword arguments are those of `reduce`.
+    """
+    return reduce(np.add, source, **kwargs)
+
+
+def max(source, **kwargs):
+    """
+    Maximum of the data of `source` along the first axis.
+
+    The keyword arguments are those of `reduce`.
+    """
+    return reduce(np.maximum, source, **kwargs)
+
+
+def min(source, **kwargs):
+    """
+    Minimum of the data of `source` along the first axis.
+
+    The keyword arguments are those of `reduce`.
+    """
+    return reduce(np.minimum, source, **kwargs)
+
+
+def nanmean(source, *, func=None, dtype=None, max_bytes=DEFAULT_MAX_BYTES,
+            readahead=True):
+    """
+    Mean of the data of `source` along the first axis, ignoring nan.
+
+    For nint32 data, the values are summed exactly (as int64), and the
+    result is float64.  For the logfloat types and the floating point
+    types, the result has the type of the data.  Where all the values are
+    nan, the result is nan.  The keyword arguments are those of `reduce`.
+    """
+    total = None
+    count = 0
+    for chunk in chunks(source, dtype=dtype, max_bytes=max_bytes,
+                        readahead=readahead):
+        if func is not None:
+            chunk = func(chunk)
+        mask = np.isnan(chunk)
+        count = count + (len(chunk) - np.count_nonzero(mask, axis=0))
+        if chunk.dtype.type is nint32:
+            values = chunk.view(np.int32).astype(np.int64)
+        else:
+            values = chunk.copy()
+        values[mask] = 0
+        total = _fold(np.add, total, values)
+    if total is None:
+        empty = _empty(source, dtype)
+        if func is not None:
+            empty = func(empty)
+        shape = empty.shape[1:]
+        total_type = np.int64 if empty.dtype.type is nint32 else empty.dtype
+        total = np.zeros(shape, dtype=total_type)[()]
+    with np.errstate(invalid='ignore'):
+        if np.asarray(total).dtype == np.int64:
+            return np.true_divide(total, count)
+        return total / np.asarray(count).astype(np.asarray(total).dtype)
+
+
+def logsumexp(source, *, func=None, dtype=None, max_bytes=DEFAULT_MAX_BYTES,
+              readahead=True):
+    """
+    log(sum(exp(x))) of the data x of `source` along the first axis.
+
+    The data are float16, float32 or float64 (or, after `func` is applied,
+    logfloat16, logfloat32 or logfloat64, whose values are the exp(x)).
+    The sums are computed with the logfloat type of the same precision, so
+    the result is identical to the log of
+    ``np.add.reduce(x.view(logfloat32), axis=0)`` (for float32 data), and
+    has the float type of the data.  The keyword arguments are those of
+    `reduce`.
+    """
+    def as_logfloat(chunk):
+        if func is not None:
+            chunk = func(chunk)
+        if chunk.dtype.type in _log_types.values():
+            return chunk
+        typ = _log_types.get(chunk.dtype.type)
+        if typ is None:
+            raise TypeError(f'logsumexp requires floating point or logfloat '
+                            f'data, not {chunk.dtype}')
+        if not chunk.dtype.isnative:
+            chunk = chunk.astype(chunk.dtype.newbyteorder('='))
+        return chunk.view(typ)
+
+    result = np.asarray(reduce(np.add, source, func=as_logfloat, dtype=dtype,
+                               max_bytes=max_bytes, readahead=readahead))
+    ftype = {logfloat16: np.float16, logfloat32: np.float32,
+             logfloat64: np.float64}[result.dtype.type]
+    return result.view(ftype)[()]
@@ -0,0 +1,111 @@
+import ctypes
+import pytest
+import numpy as np
+from numpy.testing import assert_equal
+from numtypes import nint32
+from numtypes.arrow import to_arrow, from_arrow
+
+
+class ArrowArray(ctypes.Structure):
+    _fields_ = [('length', ctypes.c_int64),
+                ('null_count', ctypes.c_int64),
+                ('offset', ctypes.c_int64),
+                ('n_buffers', ctypes.c_int64),
+                ('n_children', ctypes.c_int64),
+                ('buffers', ctypes.POINTER(ctypes.c_void_p)),
+                ('children', ctypes.c_void_p),
+                ('dictionary', ctypes.c_void_p),
+                ('release', ctypes.c_void_p),
+                ('private_data', ctypes.c_void_p)]
+
+
+class ArrowSchema(ctypes.Structure):
+    _fields_ = [('format', ctypes.c_char_p),
+                ('name', ctypes.c_char_p),
+                ('metadata', ctypes.c_char_p),
+                ('flags', ctypes.c_int64),
+                ('n_children', ctypes.c_int64),
+                ('children', ctypes.c_void_p),
+                ('dictionary', ctypes.c_void_p),
+                ('release', ctypes.c_void_p),
+                ('private_data', ctypes.c_void_p)]
+
+
+def capsule_pointer(capsule, name, struct):
+    get_pointer = ctypes.pythonapi.PyCapsule_GetPointer
+    get_pointer.restype = ctypes.c_void_p
+    get_pointer.argtypes = [ctypes.py_object, ctypes.c_char_p]
+    return ctypes.cast(get_pointer(capsule, name), ctypes.POINTER(struct))[0]
+
+
+def test_export_shares_memory_and_sets_bitmap():
+    a = np.array([1, np.nan, 3, 4, 5, 6, 7, 8, np.nan, 10], dtype=nint32)
+    schema_capsule, array_capsule = to_arrow(a).__arrow_c_array__()
+    schema = capsule_pointer(schema_capsule, b'arrow_schema', ArrowSchema)
+    assert schema.format == b'i'
+    array = capsule_pointer(array_capsule, b'arrow_array', ArrowArray)
+    assert array.length == 10
+    assert array.null_count == 2
+    assert array.n_buffers == 2
+    # The values buffer is the memory of `a`.
+    assert array.buffers[1] == a.ctypes.data
+    bitmap = ctypes.string_at(array.buffers[0], 2)
+    assert bitmap == bytes([0b11111101, 0b00000010])
+
+
+def test_export_contiguous_is_not_copied():
+    base = np.arange(10, dtype=np.int32).astype(nint32)
+    a = base[3:]
+    wrapper = to_arrow(a)
+    assert wrapper.values is a
+    _, array_capsule = wrapper.__arrow_c_array__()
+    array = capsule_pointer(array_capsule, b'arrow_array', ArrowArray)
+    assert array.buffers[1] == a.ctypes.data
+    a[0] = 100
+    assert ctypes.cast(array.buffers[1], ctypes.POINTER(ctypes.c_int32))[0] == 100
+
+
+def test_export_strided_is_copied():
+    base = np.arange(10, dtype=np.int32).astype(nint32)
+    a = base[::2]
+    wrapper = to_arrow(a)
+    assert wrapper.values.flags.c_contiguous
+    assert not np.shares_memory(wrapper.values, base)
+    _, array_capsule = wrapper.__arrow_c_array__()
+    array = capsule_pointer(array_capsule, b'arrow_array', ArrowArray)
+    assert array.buffers[1] == wrapper.values.ctypes.data
+    assert_equal(from_arrow(wrapper).astype(np.int32), [0, 2, 4, 6, 8])
+
+
+def test_export_no_nan_has_no_bitmap():
+    a = np.array([1, 2, 3], dtype=np.int32).astype(nint32)
+    _, array_capsule = to_arrow(a).__arrow_c_array__()
+    array = capsule_pointer(array_capsule, b'arrow_array', ArrowArray)
+    assert array.null_count == 0
+    assert array.buffers[0] is None
+
+
+@pytest.mark.parametrize('n', [0, 1, 7, 8, 9, 100])
+def test_roundtrip(n):
+    x = np.arange(n, dtype=np.int32)
+    x[::3] = np.iinfo(np.int32).min
+    a = x.astype(nint32)
+    b = from_arrow(to_arrow(a))
+    assert b.dtype == nint32
+    assert_equal(b.astype(np.int32), x)
+
+
+def test_export_bad_dtype():
+    with pytest.raises(TypeError, match='dtype nint32'):
+        to_arrow(np.arange(3))
+
+
+def test_pyarrow_interop():
+    pa = pytest.importorskip('pyarrow')
+    a = np.array([1, np.nan, -3], dtype=nint32)
+    pa_arr = pa.array(to_arrow(a))
+    assert pa_arr.type == pa.int32()
+    assert pa_arr.to_pylist() == [1, None, -3]
+    b = from_arrow(pa.array([None, 5, None, 7], type=pa.int32()))
+    assert_equal(np.isnan(b.astype(np.float64)), [True, False, True, False])
+    assert_equal(b[[1, 3]].astype(np.int32), [5, 7])
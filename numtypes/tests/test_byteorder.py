@@ -0,0 +1,125 @@
+
+import sys
+import pytest
+import numpy as np
+from numpy.testing import assert_equal
+from numtypes import (nint32, polarcomplex64, polarcomplex128,
+                      logpolarcomplex64, logpolarcomplex128,
+                      logfloat16, logfloat32, logfloat64,
+                      slogfloat32, slogfloat64, polar_fields)
+
+
+all_types = [nint32, polarcomplex64, polarcomplex128,
+             logpolarcomplex64, logpolarcomplex128,
+             logfloat16, logfloat32, logfloat64, slogfloat32, slogfloat64]
+
+
+def sample(typ):
+    if typ is nint32:
+        return np.array([0, 3, np.nan, -2, 7, 1], dtype=nint32)
+    x = np.array([0.0, 3.0, 0.5, 2.0, 7.0, 1.0])
+    if typ in (slogfloat32, slogfloat64):
+        x[3] = -x[3]
+    return x.astype(typ)
+
+
+def strs(a):
+    return [str(z) for z in a]
+
+
+@pytest.mark.parametrize('typ', all_types)
+@pytest.mark.parametrize('order', ['<', '>'])
+def test_newbyteorder(typ, order):
+    dt = np.dtype(typ).newbyteorder(order)
+    assert dt.type is typ
+    assert dt.isnative == (order == {'little': '<', 'big': '>'}[sys.byteorder])
+    a = sample(typ)
+    b = a.astype(dt)
+    assert b.dtype == dt
+    assert strs(b) == strs(a)
+    assert_equal(b.astype(typ).view(np.uint8), a.view(np.uint8))
+
+
+@pytest.mark.parametrize('typ', all_types)
+def test_view_swapped_bytes(typ):
+    # A view of data with the other byte order, e.g. from a file written
+    # on a machine with the other byte order.  No data is copied.
+    a = sample(typ)
+    itemsize = a.dtype.itemsize
+    swapped = a.astype(a.dtype.newbyteorder('S')).view(np.uint8)
+    b = np.frombuffer(swapped, dtype=np.dtype(typ).newbyteorder('S'))
+    assert strs(b) == strs(a)
+    assert repr(b[1]) == repr(a[1])
+    # The bytes of the first field of each element are reversed.
+    if typ in (nint32, logfloat16, logfloat32, logfloat64):
+        fsize = itemsize
+    else:
+        fsize = itemsize // 2
+    raw = a.view(np.uint8)[itemsize:itemsize + fsize]
+    assert_equal(swapped[itemsize:itemsize + fsize], raw[::-1])
+
+
+@pytest.mark.parametrize('typ', all_types)
+def test_setitem_swapped(typ):
+    a = sample(typ)
+    b = np.zeros(len(a), dtype=np.dtype(typ).newbyteorder('S'))
+    for i in range(len(a)):
+        b[i] = a[i]
+    # (The padding bytes of the slogfloat types are not compared.)
+    assert strs(b) == strs(a)
+    assert strs(b.astype(typ)) == strs(a)
+    b[::-1] = a
+    assert strs(b[::-1].astype(typ)) == strs(a)
+
+
+@pytest.mark.parametrize('typ', all_types)
+def test_nonzero_swapped(typ):
+    a = sample(typ)
+    b = a.astype(a.dtype.newbyteorder('S'))
+    assert_equal(np.nonzero(b), np.nonzero(a))
+    assert_equal(np.count_nonzero(b), np.count_nonzero(a))
+
+
+@pytest.mark.parametrize('typ', all_types)
+def test_strided_swap(typ):
+    a = sample(typ)
+    b = a.astype(a.dtype.newbyteorder('S'))
+    assert strs(b[::2].astype(typ)) == strs(a[::2])
+    assert strs(b[::-1].copy()) == strs(a[::-1])
+    c = np.empty(2*len(a), dtype=b.dtype)
+    c[::2] = a
+    assert strs(c[::2]) == strs(a)
+
+
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64,
+                                 slogfloat32, slogfloat64])
+def test_ufuncs_and_sort_swapped(typ):
+    a = sample(typ)
+    b = a.astype(a.dtype.newbyteorder('S'))
+    assert strs(b * b) == strs(a * a)
+    assert strs(np.sort(b)) == strs(np.sort(a))
+    assert b.argmin() == a.argmin()
+    assert b.argmax() == a.argmax()
+
+
+def test_ufuncs_swapped_nint32():
+    a = sample(nint32)
+    b = a.astype(a.dtype.newbyteorder('S'))
+    assert strs(b + b) == strs(a + a)
+    assert b.argmax() == a.argmax()
+
+
+@pytest.mark.parametrize('typ', [polarcomplex64, polarcomplex128])
+@pytest.mark.parametrize('order', ['<', '>'])
+def test_polar_fields_swapped(typ, order):
+    a = sample(typ)
+    a[2] = typ((2.0, 0.25))
+    b = a.astype(np.dtype(typ).newbyteorder(order))
+    r, theta = polar_fields(b)
+    expected_r, expected_theta = polar_fields(a)
+    assert r.dtype.byteorder == b.dtype.byteorder
+    assert_equal(r, expected_r)
+    assert_equal(theta, expected_theta)
+    # The views share the memory of b.
+    r[1] = 5.0
+    assert b[1] == typ(5.0)
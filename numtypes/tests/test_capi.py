@@ -0,0 +1,364 @@
+
+# The C API is used here through ctypes.  The structures below mirror the
+# tables in numtypes/include/numtypes/numtypes_api.h.
+
+import ctypes
+import math
+import os
+import shutil
+import subprocess
+import sys
+import sysconfig
+import textwrap
+import pytest
+import numpy as np
+from numpy.testing import assert_equal, assert_allclose
+import numtypes
+from numtypes import (nint32, polarcomplex64, polarcomplex128,
+                      logfloat16, logfloat32, logfloat64,
+                      set_logadd_precision)
+from numtypes import _nint, _polarcomplex, _logtypes
+
+
+c_bool_p = ctypes.POINTER(ctypes.c_bool)
+
+
+class PolarComplex64(ctypes.Structure):
+    _fields_ = [('r', ctypes.c_float), ('theta', ctypes.c_float)]
+
+
+class PolarComplex128(ctypes.Structure):
+    _fields_ = [('r', ctypes.c_double), ('theta', ctypes.c_double)]
+
+
+# The strided loops and the box and unbox functions are called with the
+# GIL held (PYFUNCTYPE), and a Python exception that they set is raised.
+strided_loop = ctypes.PYFUNCTYPE(None, ctypes.POINTER(ctypes.c_void_p),
+                                 ctypes.POINTER(ctypes.c_ssize_t),
+                                 ctypes.POINTER(ctypes.c_ssize_t),
+                                 ctypes.c_void_p)
+
+
+def box(argtype):
+    # The result is a new reference; see call_box.
+    return ctypes.PYFUNCTYPE(ctypes.c_void_p, argtype)
+
+
+def unbox(ptrtype):
+    return ctypes.PYFUNCTYPE(ctypes.c_int, ctypes.py_object, ptrtype)
+
+
+def binary(restype, argtype, *extra):
+    return ctypes.CFUNCTYPE(restype, argtype, argtype, *extra)
+
+
+class NInt32API(ctypes.Structure):
+    _fields_ = ([('version', ctypes.c_uint),
+                 ('type', ctypes.c_void_p),
+                 ('descr', ctypes.c_void_p),
+                 ('type_num', ctypes.c_int),
+                 ('box', box(ctypes.c_int32)),
+                 ('unbox', unbox(ctypes.POINTER(ctypes.c_int32)))]
+                + [(name, binary(ctypes.c_int32, ctypes.c_int32, c_bool_p))
+                   for name in ['add', 'subtract', 'multiply', 'floor_divide']]
+                + [(name, binary(ctypes.c_int32, ctypes.c_int32))
+                   for name in ['minimum', 'maximum']]
+                + [(f'{name}_loop', strided_loop)
+                   for name in ['add', 'subtract', 'multiply', 'floor_divide',
+                                'minimum', 'maximum']])
+
+
+polar_opers = ['add', 'subtract', 'multiply', 'divide']
+
+
+class PolarComplexAPI(ctypes.Structure):
+    _fields_ = ([('version', ctypes.c_uint),
+                 ('polarcomplex64_type', ctypes.c_void_p),
+                 ('polarcomplex128_type', ctypes.c_void_p),
+                 ('polarcomplex64_descr', ctypes.c_void_p),
+                 ('polarcomplex128_descr', ctypes.c_void_p),
+                 ('polarcomplex64_type_num', ctypes.c_int),
+                 ('polarcomplex128_type_num', ctypes.c_int),
+                 ('polarcomplex64_box', box(PolarComplex64)),
+                 ('polarcomplex128_box', box(PolarComplex128)),
+                 ('unbox', unbox(ctypes.POINTER(PolarComplex128)))]
+                + [(f'polarcomplex64_{oper}', binary(PolarComplex64, PolarComplex64))
+                   for oper in polar_opers]
+                + [(f'polarcomplex128_{oper}', binary(PolarComplex128, PolarComplex128))
+                   for oper in polar_opers]
+                + [(f'polarcomplex{nbits}_{oper}_loop', strided_loop)
+                   for nbits in [64, 128] for oper in polar_opers])
+
+
+log_opers = ['log_add', 'log_subtract', 'log_add_fast', 'log_subtract_fast']
+log_loop_opers = ['add', 'subtract', 'multiply', 'true_divide']
+
+
+class LogTypesAPI(ctypes.Structure):
+    _fields_ = ([('version', ctypes.c_uint)]
+                + [(f'logfloat{nbits}_type', ctypes.c_void_p)
+                   for nbits in [16, 32, 64]]
+                + [(f'logfloat{nbits}_descr', ctypes.c_void_p)
+                   for nbits in [16, 32, 64]]
+                + [(f'logfloat{nbits}_type_num', ctypes.c_int)
+                   for nbits in [16, 32, 64]]
+                + [(f'logfloat{nbits}_box', box(ctypes.c_double))
+                   for nbits in [16, 32, 64]]
+                + [('unbox', unbox(ctypes.POINTER(ctypes.c_double)))]
+                + [(f'logfloat32_{oper}', binary(ctypes.c_float, ctypes.c_float))
+                   for oper in log_opers]
+                + [(f'logfloat64_{oper}', binary(ctypes.c_double, ctypes.c_double))
+                   for oper in log_opers]
+                + [(f'logfloat{nbits}_{oper}_loop', strided_loop)
+                   for nbits in [16, 32, 64] for oper in log_loop_opers])
+
+
+def get_api(module, structure):
+    get_pointer = ctypes.pythonapi.PyCapsule_GetPointer
+    get_pointer.restype = ctypes.c_void_p
+    get_pointer.argtypes = [ctypes.py_object, ctypes.c_char_p]
+    name = f'{module.__name__}._C_API'.encode()
+    return structure.from_address(get_pointer(module._C_API, name))
+
+
+nint32_api = get_api(_nint, NInt32API)
+polarcomplex_api = get_api(_polarcomplex, PolarComplexAPI)
+logtypes_api = get_api(_logtypes, LogTypesAPI)
+
+
+def call_box(func, value):
+    # Convert the new reference returned by func to a Python object.
+    address = func(value)
+    obj = ctypes.cast(address, ctypes.py_object).value
+    ctypes.pythonapi.Py_DecRef(ctypes.c_void_p(address))
+    return obj
+
+
+def call_loop(loop, x, y, dtype):
+    out = np.empty(np.broadcast(x, y).shape, dtype=dtype)
+    arrays = [x, y, out]
+    args = (ctypes.c_void_p * 3)(*[a.ctypes.data for a in arrays])
+    dimensions = (ctypes.c_ssize_t * 1)(out.size)
+    steps = (ctypes.c_ssize_t * 3)(*[a.strides[0] if a.ndim else 0
+                                     for a in arrays])
+    loop(args, dimensions, steps, None)
+    return out
+
+
+def test_get_include():
+    header = os.path.join(numtypes.get_include(), 'numtypes',
+                          'numtypes_api.h')
+    assert os.path.isfile(header)
+    assert os.path.isfile(os.path.join(os.path.dirname(numtypes.__file__),
+                                       'capi.pxd'))
+
+
+cython_source = """
+from numtypes cimport capi
+
+capi.import_numtypes()
+
+
+def check():
+    cdef capi.numtypes_polarcomplex128 z
+    z.r = 2.0
+    z.theta = 0.5
+    return (capi.NUMTYPES_API_VERSION,
+            capi.numtypes_nint32_api.box(capi.NUMTYPES_NINT32_NAN),
+            capi.numtypes_polarcomplex_api.polarcomplex128_box(z),
+            capi.numtypes_logtypes_api.logfloat64_log_add(-1.0, -2.5))
+"""
+
+setup_source = """
+import numpy
+import numtypes
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+ext = Extension('use_capi', ['use_capi.pyx'],
+                include_dirs=[numtypes.get_include(), numpy.get_include()])
+setup(ext_modules=cythonize([ext], language_level=3, quiet=True))
+"""
+
+
+def test_cython_pxd(tmp_path):
+    # Compile an extension that cimports capi.pxd and use it.
+    pytest.importorskip('Cython')
+    pytest.importorskip('setuptools')
+    cc = (sysconfig.get_config_var('CC') or 'cc').split()[0]
+    if shutil.which(cc) is None:
+        pytest.skip('no C compiler')
+    (tmp_path / 'use_capi.pyx').write_text(cython_source)
+    (tmp_path / 'setup.py').write_text(setup_source)
+    build = subprocess.run([sys.executable, 'setup.py', 'build_ext',
+                            '--inplace'], cwd=tmp_path, capture_output=True,
+                           text=True)
+    assert build.returncode == 0, build.stdout + build.stderr
+    code = textwrap.dedent("""
+        import math
+        from numtypes import nint32, polarcomplex128
+        import use_capi
+        version, x, z, s = use_capi.check()
+        assert version == 1
+        assert type(x) is nint32 and math.isnan(float(x))
+        assert type(z) is polarcomplex128 and (z.r, z.theta) == (2.0, 0.5)
+        assert math.isclose(s, math.log(math.exp(-1.0) + math.exp(-2.5)),
+                            rel_tol=1e-15)
+    """)
+    run = subprocess.run([sys.executable, '-c', code], cwd=tmp_path,
+                         capture_output=True, text=True)
+    assert run.returncode == 0, run.stderr
+
+
+@pytest.mark.parametrize('api', [nint32_api, polarcomplex_api, logtypes_api])
+def test_version(api):
+    assert api.version == 1
+
+
+@pytest.mark.parametrize('typ, api_type, api_descr, api_type_num',
+                         [(nint32, 'type', 'descr', 'type_num')]
+                         + [(typ, f'{typ.__name__}_type',
+                             f'{typ.__name__}_descr',
+                             f'{typ.__name__}_type_num')
+                            for typ in [polarcomplex64, polarcomplex128,
+                                        logfloat16, logfloat32, logfloat64]])
+def test_types_and_descrs(typ, api_type, api_descr, api_type_num):
+    api = {nint32: nint32_api,
+           polarcomplex64: polarcomplex_api,
+           polarcomplex128: polarcomplex_api}.get(typ, logtypes_api)
+    assert getattr(api, api_type) == id(typ)
+    assert getattr(api, api_descr) == id(typ.dtype)
+    assert getattr(api, api_type_num) == np.dtype(typ).num
+
+
+def test_nint32_box_unbox():
+    assert call_box(nint32_api.box, -12) == nint32(-12)
+    assert math.isnan(float(call_box(nint32_api.box, -2**31)))
+    value = ctypes.c_int32()
+    for obj, expected in [(nint32(5), 5), (17, 17), (float('nan'), -2**31),
+                          ('-3', -3)]:
+        assert nint32_api.unbox(obj, ctypes.byref(value)) == 0
+        assert value.value == expected
+    with pytest.raises(OverflowError):
+        nint32_api.unbox(2**40, ctypes.byref(value))
+
+
+def test_nint32_kernels():
+    flag = ctypes.c_bool(False)
+    assert nint32_api.add(3, 4, ctypes.byref(flag)) == 7
+    assert nint32_api.floor_divide(-7, 2, ctypes.byref(flag)) == -4
+    assert nint32_api.multiply(-2**31, 2, ctypes.byref(flag)) == -2**31
+    assert not flag.value
+    nint32_api.add(2**31 - 1, 1, ctypes.byref(flag))
+    assert flag.value
+    flag.value = False
+    nint32_api.floor_divide(1, 0, ctypes.byref(flag))
+    assert flag.value
+    assert nint32_api.minimum(3, -2**31) == -2**31
+    assert nint32_api.maximum(3, 9) == 9
+
+
+@pytest.mark.parametrize('oper', ['add', 'subtract', 'multiply',
+                                  'floor_divide', 'minimum', 'maximum'])
+def test_nint32_loops(oper):
+    x = np.array([5, -7, 12, 100, -2**31], dtype=np.int32).astype(nint32)
+    y = np.array([3, 2, -5, 9, 1], dtype=np.int32).astype(nint32)
+    loop = getattr(nint32_api, f'{oper}_loop')
+    ufunc = getattr(np, oper)
+    assert_equal(call_loop(loop, x, y, nint32).view(np.int32),
+                 ufunc(x, y).view(np.int32))
+    # A scalar second operand (stride 0).
+    assert_equal(call_loop(loop, x, y[:1].reshape(()), nint32).view(np.int32),
+                 ufunc(x, y[0]).view(np.int32))
+
+
+def test_nint32_loop_error():
+    x = np.array([2**31 - 1], dtype=np.int32).astype(nint32)
+    with pytest.raises(RuntimeError, match='overflow'):
+        call_loop(nint32_api.add_loop, x, x, nint32)
+
+
+@pytest.mark.parametrize('nbits', [64, 128])
+def test_polarcomplex_box_unbox(nbits):
+    typ = {64: polarcomplex64, 128: polarcomplex128}[nbits]
+    struct = {64: PolarComplex64, 128: PolarComplex128}[nbits]
+    z = call_box(getattr(polarcomplex_api, f'polarcomplex{nbits}_box'),
+                 struct(2.0, 0.5))
+    assert type(z) is typ
+    assert (z.r, z.theta) == (2.0, 0.5)
+    value = PolarComplex128()
+    assert polarcomplex_api.unbox(z, ctypes.byref(value)) == 0
+    assert (value.r, value.theta) == (2.0, 0.5)
+    assert polarcomplex_api.unbox((3.0, -1.0), ctypes.byref(value)) == 0
+    assert (value.r, value.theta) == (3.0, -1.0)
+    assert polarcomplex_api.unbox(2j, ctypes.byref(value)) == 0
+    assert (value.r, value.theta) == (2.0, math.pi/2)
+    with pytest.raises(TypeError):
+        polarcomplex_api.unbox('abc'.encode(), ctypes.byref(value))
+
+
+@pytest.mark.parametrize('nbits', [64, 128])
+@pytest.mark.parametrize('oper', polar_opers)
+def test_polarcomplex_kernels_and_loops(nbits, oper):
+    typ = {64: polarcomplex64, 128: polarcomplex128}[nbits]
+    struct = {64: PolarComplex64, 128: PolarComplex128}[nbits]
+    x = np.array([typ((2.0, 0.5)), typ((1.5, -2.0)), typ((0.25, 3.0))])
+    y = np.array([typ((0.5, 1.0)), typ((3.0, 2.5)), typ((1.0, -0.75))])
+    ufunc = {'divide': np.true_divide}.get(oper, getattr(np, oper))
+    expected = ufunc(x, y)
+    kernel = getattr(polarcomplex_api, f'polarcomplex{nbits}_{oper}')
+    for a, b, c in zip(x, y, expected):
+        z = kernel(struct(a.r, a.theta), struct(b.r, b.theta))
+        assert (z.r, z.theta) == (c.r, c.theta)
+    loop = getattr(polarcomplex_api, f'polarcomplex{nbits}_{oper}_loop')
+    out = call_loop(loop, x, y, typ)
+    assert [(z.r, z.theta) for z in out] == [(z.r, z.theta) for z in expected]
+
+
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
+def test_logfloat_box_unbox(typ):
+    box = getattr(logtypes_api, f'{typ.__name__}_box')
+    z = call_box(box, -1000.1)
+    assert type(z) is typ
+    assert z == typ(log=-1000.1)
+    value = ctypes.c_double()
+    assert logtypes_api.unbox(z, ctypes.byref(value)) == 0
+    assert value.value == z.log
+    assert logtypes_api.unbox(4.0, ctypes.byref(value)) == 0
+    assert value.value == math.log(4.0)
+    assert logtypes_api.unbox('log=-3.5', ctypes.byref(value)) == 0
+    assert value.value == -3.5
+    with pytest.raises(TypeError):
+        logtypes_api.unbox([1.0], ctypes.byref(value))
+
+
+@pytest.mark.parametrize('nbits, rtol', [(32, 1e-6), (64, 1e-15)])
+def test_logfloat_kernels(nbits, rtol):
+    log_add = getattr(logtypes_api, f'logfloat{nbits}_log_add')
+    log_subtract = getattr(logtypes_api, f'logfloat{nbits}_log_subtract')
+    assert_allclose(log_add(-1.0, -2.5), np.logaddexp(-1.0, -2.5), rtol=rtol)
+    assert log_add(-np.inf, -3.0) == -3.0
+    assert_allclose(log_subtract(-1.0, -2.5),
+                    np.log(np.exp(-1.0) - np.exp(-2.5)), rtol=rtol)
+    assert math.isnan(log_subtract(-2.5, -1.0))
+    for oper in ['add', 'subtract']:
+        full = getattr(logtypes_api, f'logfloat{nbits}_log_{oper}')
+        fast = getattr(logtypes_api, f'logfloat{nbits}_log_{oper}_fast')
+        for log1, log2 in [(0.0, -0.3), (-5.0, -7.25), (2.0, -30.0)]:
+            assert abs(fast(log1, log2) - full(log1, log2)) < 2e-6
+
+
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
+@pytest.mark.parametrize('oper', log_loop_opers)
+@pytest.mark.parametrize('precision', ['full', 'fast'])
+def test_logfloat_loops(typ, oper, precision):
+    x = np.array([2.0, 0.5, 10.0, 3.0]).astype(typ)
+    y = np.array([1.0, 0.25, 1e-3, 3.0]).astype(typ)
+    loop = getattr(logtypes_api, f'{typ.__name__}_{oper}_loop')
+    old = set_logadd_precision(precision)
+    try:
+        expected = getattr(np, oper)(x, y)
+        out = call_loop(loop, x, y, typ)
+    finally:
+        set_logadd_precision(old)
+    assert_equal([z.log for z in out], [z.log for z in expected])
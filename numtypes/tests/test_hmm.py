@@ -0,0 +1,163 @@
+import itertools
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal
+from numtypes import logfloat16, logfloat32, logfloat64, set_logadd_precision
+from numtypes import hmm
+
+
+# The tolerances of the logs of the results.
+typ_rtol = [(logfloat16, 2e-3), (logfloat32, 1e-5), (logfloat64, 1e-12)]
+
+
+def logs(a):
+    # The logs of the logfloat array a, as float64.
+    ftype = {logfloat16: np.float16, logfloat32: np.float32,
+             logfloat64: np.float64}[a.dtype.type]
+    return a.view(ftype).astype(np.float64)
+
+
+def random_hmm(rng, n, nt, typ, batch=()):
+    init = rng.dirichlet(np.ones(n), size=batch)
+    trans = rng.dirichlet(np.ones(n), size=batch + (n,))
+    emit = rng.uniform(0.01, 1, size=batch + (nt, n))
+    return init.astype(typ), trans.astype(typ), emit.astype(typ)
+
+
+def ref_forward(init, trans, emit):
+    alpha = np.empty_like(emit)
+    alpha[0] = init + emit[0]
+    for k in range(1, len(emit)):
+        alpha[k] = np.logaddexp.reduce(alpha[k - 1][:, None] + trans,
+                                       axis=0) + emit[k]
+    return alpha
+
+
+def ref_backward(trans, emit):
+    beta = np.zeros_like(emit)
+    for k in range(len(emit) - 2, -1, -1):
+        beta[k] = np.logaddexp.reduce(trans + emit[k + 1] + beta[k + 1],
+                                      axis=1)
+    return beta
+
+
+def ref_viterbi(init, trans, emit):
+    # Check all the paths.
+    nt, n = emit.shape
+    best = None
+    for path in itertools.product(range(n), repeat=nt):
+        p = init[path[0]] + sum(emit[k, s] for k, s in enumerate(path))
+        p += sum(trans[path[k - 1], path[k]] for k in range(1, nt))
+        if best is None or p > best[1]:
+            best = (path, p)
+    return list(best[0]), best[1]
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+def test_forward_backward(typ, rtol):
+    rng = np.random.default_rng(12345)
+    init, trans, emit = random_hmm(rng, 4, 30, typ)
+    alpha = hmm.forward(init, trans, emit)
+    beta = hmm.backward(trans, emit)
+    assert alpha.dtype == typ and alpha.shape == (30, 4)
+    assert beta.dtype == typ and beta.shape == (30, 4)
+    assert_allclose(logs(alpha), ref_forward(logs(init), logs(trans),
+                                             logs(emit)), rtol=rtol)
+    assert_allclose(logs(beta), ref_backward(logs(trans), logs(emit)),
+                    rtol=rtol, atol=rtol)
+    # The probability of the observations is sum(alpha[k]*beta[k]) for
+    # every k.
+    p = np.logaddexp.reduce(logs(alpha) + logs(beta), axis=1)
+    assert_allclose(p, p[-1], rtol=10*rtol)
+
+
+@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+def test_viterbi(typ):
+    rng = np.random.default_rng(987)
+    for _ in range(5):
+        init, trans, emit = random_hmm(rng, 3, 6, typ)
+        path, score = hmm.viterbi(init, trans, emit)
+        assert path.dtype == np.intp
+        assert score.dtype == typ
+        expected_path, expected_score = ref_viterbi(logs(init), logs(trans),
+                                                    logs(emit))
+        assert_equal(path, expected_path)
+        assert_allclose(score.log, expected_score, rtol=1e-6)
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+def test_batch(typ, rtol):
+    rng = np.random.default_rng(2468)
+    init, trans, emit = random_hmm(rng, 3, 10, typ, batch=(2, 5))
+    # A single initial distribution for all the sequences.
+    init = init[0, 0]
+    alpha = hmm.forward(init, trans, emit)
+    beta = hmm.backward(trans, emit)
+    path, score = hmm.viterbi(init, trans, emit)
+    assert alpha.shape == beta.shape == (2, 5, 10, 3)
+    assert path.shape == (2, 5, 10)
+    assert score.shape == (2, 5)
+    for i, j in np.ndindex(2, 5):
+        assert_equal(logs(alpha[i, j]),
+                     logs(hmm.forward(init, trans[i, j], emit[i, j])))
+        assert_equal(logs(beta[i, j]),
+                     logs(hmm.backward(trans[i, j], emit[i, j])))
+        p, s = hmm.viterbi(init, trans[i, j], emit[i, j])
+        assert_equal(path[i, j], p)
+        assert score[i, j] == s
+
+
+def test_noncontiguous():
+    rng = np.random.default_rng(13579)
+    init, trans, emit = random_hmm(rng, 4, 12, logfloat64)
+    # Fortran-ordered trans and emit, and every other element of init.
+    init2 = np.repeat(init, 2)[::2]
+    trans2 = np.asfortranarray(trans)
+    emit2 = np.asfortranarray(emit)
+    assert_equal(logs(hmm.forward(init2, trans2, emit2)),
+                 logs(hmm.forward(init, trans, emit)))
+    assert_equal(logs(hmm.backward(trans2, emit2)),
+                 logs(hmm.backward(trans, emit)))
+    assert_equal(hmm.viterbi(init2, trans2, emit2)[0],
+                 hmm.viterbi(init, trans, emit)[0])
+
+
+def test_zero_probabilities():
+    # A left-to-right model: state 1 can't be left, and the sequence must
+    # start in state 0.
+    init = np.array([1.0, 0.0]).astype(logfloat64)
+    trans = np.array([[0.5, 0.5], [0.0, 1.0]]).astype(logfloat64)
+    emit = np.array([[0.9, 0.2], [0.1, 0.8], [0.9, 0.2]]).astype(logfloat64)
+    alpha = hmm.forward(init, trans, emit)
+    assert alpha[0, 1].log == -np.inf
+    assert_allclose(alpha[1].astype(float), [0.9*0.5*0.1, 0.9*0.5*0.8])
+    path, score = hmm.viterbi(init, trans, emit)
+    assert_equal(path, [0, 1, 1])
+    assert_allclose(float(score), 0.9*0.5*0.8*1.0*0.2)
+
+
+def test_fast_precision():
+    rng = np.random.default_rng(1122)
+    init, trans, emit = random_hmm(rng, 5, 50, logfloat64)
+    full = logs(hmm.forward(init, trans, emit))
+    old = set_logadd_precision('fast')
+    try:
+        fast = logs(hmm.forward(init, trans, emit))
+    finally:
+        set_logadd_precision(old)
+    assert not np.array_equal(fast, full)
+    # Each step adds at most n - 1 errors of 5e-7.
+    assert_allclose(fast, full, rtol=0, atol=50*4*5e-7)
+
+
+def test_empty():
+    init = np.array([0.5, 0.5]).astype(logfloat64)
+    trans = np.full((2, 2), 0.5).astype(logfloat64)
+    emit = np.zeros((0, 2), dtype=logfloat64)
+    assert hmm.forward(init, trans, emit).shape == (0, 2)
+    assert hmm.backward(trans, emit).shape == (0, 2)
+    path, score = hmm.viterbi(init, trans, emit)
+    assert path.shape == (0,)
+    assert score.log == 0.0
+    with pytest.raises(ValueError, match='at least one state'):
+        hmm.viterbi(init[:0], trans[:0, :0], np.zeros((3, 0), logfloat64))
@@ -0,0 +1,85 @@
+
+import subprocess
+import sys
+import sysconfig
+import pytest
+import numtypes
+
+
+def run(code):
+    # Run code in a new interpreter, so the modules imported by the test
+    # process don't matter.
+    result = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+def test_logfloat_does_not_import_numpy():
+    out = run('import sys; from numtypes import logfloat; '
+              'x = logfloat(2.0) * logfloat(log=-1000); '
+              'print("numpy" in sys.modules, type(x).__name__)')
+    assert out == 'False logfloat'
+
+
+def test_import_is_lazy():
+    out = run('import sys, numtypes; '
+              'print(sorted(m for m in sys.modules if m.startswith("numtypes.")'
+              ' or m == "numpy"))')
+    assert out == "['numtypes._version']"
+    out = run('import sys; from numtypes import nint32; '
+              'print("numtypes._logtypes" in sys.modules)')
+    assert out == 'False'
+
+
+@pytest.mark.parametrize('name', numtypes.__all__)
+def test_all(name):
+    assert getattr(numtypes, name) is not None
+    assert name in dir(numtypes)
+
+
+def test_missing_attribute():
+    with pytest.raises(AttributeError, match='no attribute'):
+        numtypes.not_a_type
+
+
+def test_pickle_lazy():
+    # Unpickling looks up numtypes.<name>, which must trigger the import.
+    out = run('import pickle, numpy as np; '
+              'data = pickle.dumps(np.array([1, 2], dtype=np.dtype('
+              '__import__("numtypes").nint32))); '
+              'import sys; del sys.modules["numtypes"]; '
+              'print(pickle.loads(data).dtype)')
+    assert out == 'nint32'
+
+
+extension_modules = ['_nint', '_polarcomplex', '_logpolarcomplex',
+                     '_logtypes', '_slogtypes', '_python_logtypes']
+
+
+def test_reimport():
+    # The extension modules use multi-phase initialization, so importing
+    # one again after it is removed from sys.modules creates a new module
+    # object.  The types and dtypes are registered with NumPy only once,
+    # and are shared by the module objects.
+    out = run('import sys, importlib, numpy as np; '
+              f'names = ["numtypes." + m for m in {extension_modules!r}]; '
+              'old = [importlib.import_module(m) for m in names]; '
+              '[sys.modules.pop(m) for m in names]; '
+              'new = [importlib.import_module(m) for m in names]; '
+              'print(all(a is not b and all(getattr(b, k) is v for k, v in '
+              'vars(a).items() if isinstance(v, (type, np.ufunc))) '
+              'for a, b in zip(old, new)), '
+              'np.array([1, 2], dtype=new[0].nint32).sum())')
+    assert out == 'True 3'
+
+
+@pytest.mark.skipif(not hasattr(sys, '_is_gil_enabled')
+                    or not sysconfig.get_config_var('Py_GIL_DISABLED'),
+                    reason='requires the free-threaded build of CPython')
+def test_gil_not_enabled():
+    # In the free-threaded build, importing an extension module that does
+    # not declare Py_mod_gil re-enables the GIL for the whole process.
+    out = run('import sys, importlib; '
+              f'[importlib.import_module("numtypes." + m) for m in {extension_modules!r}]; '
+              'print(sys._is_gil_enabled())')
+    assert out == 'False'
@@ -0,0 +1,129 @@
+"""
+Tests with arrays of more than 2**31 elements.
+
+The arrays are memory-mapped sparse files: a file has the size of its
+array, but only the pages that are written use disk space.  Most of each
+array is zero bytes, and a few elements are set beyond index 2**31 to
+check that the loops and the dtype functions processed the whole array.
+
+Reading the arrays takes a while (the largest file is 32 GiB), and the
+outputs of the ufunc and cast tests use up to 4 GiB of disk, so these
+tests only run if the environment variable NUMTYPES_TEST_LARGE is set:
+
+    NUMTYPES_TEST_LARGE=1 python -m pytest --pyargs numtypes.tests.test_large
+
+benchmarks/bench_large.py times the same operations.
+"""
+
+import os
+import pytest
+import numpy as np
+from numtypes import (nint32, polarcomplex64, polarcomplex128,
+                      logpolarcomplex64, logpolarcomplex128,
+                      logfloat16, logfloat32, logfloat64,
+                      slogfloat32, slogfloat64)
+
+
+pytestmark = pytest.mark.skipif(not os.environ.get('NUMTYPES_TEST_LARGE'),
+                                reason='set NUMTYPES_TEST_LARGE to run the '
+                                       'tests with large arrays')
+
+n = 2**31 + 16
+
+# The elements that are set; the rest of an array is zero bytes.
+marked = [5, n - 3]
+
+# The ufunc whose reduction has the value with zero bytes as its identity
+# (e.g. logfloat32(log=0.0) is 1).
+reduce_ufuncs = {
+    nint32: np.add,
+    polarcomplex64: np.add,
+    polarcomplex128: np.add,
+    logpolarcomplex64: np.multiply,
+    logpolarcomplex128: np.multiply,
+    logfloat16: np.multiply,
+    logfloat32: np.multiply,
+    logfloat64: np.multiply,
+    slogfloat32: np.multiply,
+    slogfloat64: np.multiply,
+}
+
+ordered_types = [nint32, logfloat16, logfloat32, logfloat64,
+                 slogfloat32, slogfloat64]
+
+log_types = [logfloat16, logfloat32, logfloat64, slogfloat32, slogfloat64]
+
+
+def sparse_array(path, typ, values):
+    a = np.memmap(path, dtype=typ, mode='w+', shape=(n,))
+    for i, value in zip(marked, values):
+        a[i] = value
+    # The array is returned writeable, because ndarray.argmax copies a
+    # read-only array.
+    return a
+
+
+@pytest.fixture
+def tmpfile(tmp_path):
+    path = tmp_path / 'large.dat'
+    yield path
+    path.unlink(missing_ok=True)
+
+
+@pytest.mark.parametrize('typ', list(reduce_ufuncs))
+def test_reduce(typ, tmpfile):
+    values = [typ(2), typ(3)]
+    a = sparse_array(tmpfile, typ, values)
+    ufunc = reduce_ufuncs[typ]
+    small = np.zeros(3, dtype=typ)
+    small[:2] = values
+    assert str(ufunc.reduce(a)) == str(ufunc.reduce(small))
+    # Zero bytes are 0 for nint32 and the polarcomplex types; for the
+    # other types, they have log=0.0, which is nonzero.
+    nonzero = 2 if ufunc is np.add else n
+    assert np.count_nonzero(a) == nonzero
+    del a
+
+
+@pytest.mark.parametrize('typ', ordered_types)
+def test_argmax_argmin(typ, tmpfile):
+    a = sparse_array(tmpfile, typ, [typ(2), typ(3)])
+    assert a.argmax() == n - 3
+    assert str(np.maximum.reduce(a)) == str(typ(3))
+    # (Zero bytes are 0 for nint32; for the slogfloat types they have
+    # log=0.0 and sign=0, which compares like 0.)
+    if typ in (logfloat16, logfloat32, logfloat64):
+        smallest = typ(0.5)
+    else:
+        smallest = typ(-1)
+    a = sparse_array(tmpfile, typ, [typ(3), smallest])
+    assert a.argmin() == n - 3
+    del a
+
+
+@pytest.mark.parametrize('typ', log_types)
+def test_isfinite(typ, tmp_path):
+    a = sparse_array(tmp_path / 'large.dat', typ, [typ(2), typ(np.inf)])
+    out = np.memmap(tmp_path / 'out.dat', dtype=bool, mode='w+', shape=(n,))
+    try:
+        np.isfinite(a, out=out)
+        assert out[-4] and not out[-3] and out[-2] and out[-1]
+        assert np.count_nonzero(out) == n - 1
+    finally:
+        del a, out
+        for name in ['large.dat', 'out.dat']:
+            (tmp_path / name).unlink()
+
+
+def test_cast(tmpfile, tmp_path):
+    # A contiguous cast of the whole array.
+    a = sparse_array(tmpfile, np.float16, [2, 3])
+    out = np.memmap(tmp_path / 'out.dat', dtype=logfloat16, mode='w+',
+                    shape=(n,))
+    try:
+        out[...] = a
+        assert str(out[-3]) == str(logfloat16(3))
+        assert str(out[-2]) == str(logfloat16(0))
+    finally:
+        del a, out
+        (tmp_path / 'out.dat').unlink()
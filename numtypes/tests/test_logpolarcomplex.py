@@ -0,0 +1,162 @@
+
+import math
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal
+from numtypes import (logpolarcomplex64, logpolarcomplex128,
+                      polarcomplex64, polarcomplex128)
+
+
+typ_rtol = [(logpolarcomplex64, 2e-6), (logpolarcomplex128, 5e-15)]
+
+z1 = np.array([1 + 2j, -3 + 0.5j, -2 - 2j, 0.25j])
+z2 = np.array([3 - 1j, 2 + 2j, -0.5 + 1j, 4.0])
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+def test_basic(typ, rtol):
+    z = typ(3 + 4j)
+    assert math.isclose(z.log_r, math.log(5), rel_tol=rtol)
+    assert math.isclose(z.theta, math.atan2(4, 3), rel_tol=rtol)
+    assert math.isclose(z.r, 5, rel_tol=rtol)
+    assert math.isclose(z.real, 3, rel_tol=rtol)
+    assert math.isclose(z.imag, 4, rel_tol=rtol)
+    assert math.isclose(abs(z), 5, rel_tol=rtol)
+    assert bool(z)
+    assert not bool(typ(0))
+
+
+@pytest.mark.parametrize('typ', [logpolarcomplex64, logpolarcomplex128])
+def test_tuple_init(typ):
+    z = typ((-1000.0, 0.5))
+    assert z.log_r == -1000.0
+    assert z.theta == 0.5
+    with pytest.raises(ValueError, match='must have length 2'):
+        typ((1.0, 2.0, 3.0))
+    with pytest.raises(TypeError, match='must be a tuple of two floats'):
+        typ('abc')
+
+
+def test_extreme_magnitudes():
+    z = logpolarcomplex128((-1000.0, 0.5))
+    w = z * z
+    assert w.log_r == -2000.0
+    assert w.theta == 1.0
+    s = z + z
+    assert math.isclose(s.log_r, -1000.0 + math.log(2), rel_tol=1e-15)
+    assert math.isclose(s.theta, 0.5, rel_tol=1e-15)
+    assert (z - z).log_r == -math.inf
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+@pytest.mark.parametrize('ufunc', [np.add, np.subtract, np.multiply,
+                                   np.true_divide])
+def test_binary_ufuncs(typ, rtol, ufunc):
+    p = ufunc(z1.astype(typ), z2.astype(typ))
+    assert p.dtype == typ
+    assert_allclose(p.astype(np.complex128), ufunc(z1, z2), rtol=rtol)
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+@pytest.mark.parametrize('ufunc', [np.negative, np.positive, np.conjugate,
+                                   np.reciprocal, np.square, np.sqrt,
+                                   np.exp, np.log])
+def test_unary_ufuncs(typ, rtol, ufunc):
+    p = ufunc(z1.astype(typ))
+    assert p.dtype == typ
+    assert_allclose(p.astype(np.complex128), ufunc(z1), rtol=rtol)
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+def test_power_and_absolute(typ, rtol):
+    p = z1.astype(typ)
+    assert_allclose((p**2.5).astype(np.complex128), z1**2.5, rtol=rtol)
+    m = np.abs(p)
+    assert m.dtype == (np.float32 if typ == logpolarcomplex64 else np.float64)
+    assert_allclose(m, np.abs(z1), rtol=rtol)
+
+
+@pytest.mark.parametrize('typ', [logpolarcomplex64, logpolarcomplex128])
+def test_multiply_reduce_no_underflow(typ):
+    p = np.full(1000, typ((-80.0, 0.001)))
+    w = np.multiply.reduce(p)
+    assert_allclose(w.log_r, -80000.0, rtol=1e-6)
+    assert_allclose(w.theta, 1.0, rtol=1e-5)
+
+
+@pytest.mark.parametrize('typ', [logpolarcomplex64, logpolarcomplex128])
+def test_comparison_ufuncs(typ):
+    p = np.array([typ((1.0, 0.5)), typ((1.0, 0.5)), typ(0)])
+    q = np.array([typ((1.0, 0.5)), typ((1.0, 0.25)), typ((-np.inf, 2.0))])
+    # All values with log_r = -inf are 0.
+    assert_equal(p == q, [True, False, True])
+    assert_equal(p != q, ~(p == q))
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+@pytest.mark.parametrize('ctyp', [np.complex64, np.complex128,
+                                  np.clongdouble])
+def test_cast_complex_roundtrip(typ, rtol, ctyp):
+    z = np.concatenate((z1, [-3.0])).astype(ctyp)
+    w = z.astype(typ).astype(ctyp)
+    rtol = max(rtol, 10*np.finfo(ctyp).eps)
+    assert_allclose(w.astype(np.complex128), z.astype(np.complex128),
+                    rtol=rtol, atol=rtol)
+
+
+@pytest.mark.parametrize('typ', [logpolarcomplex64, logpolarcomplex128])
+def test_cast_real(typ):
+    p = np.array([2.0, -2.0, 0.0]).astype(typ)
+    assert_allclose([w.log_r for w in p], [math.log(2), math.log(2), -np.inf])
+    assert_allclose([w.theta for w in p], [0.0, np.pi, 0.0])
+    assert_allclose(p.astype(np.float64), [2.0, 2.0, 0.0])
+
+
+@pytest.mark.parametrize('typ', [logpolarcomplex64, logpolarcomplex128])
+@pytest.mark.parametrize('pctyp', [polarcomplex64, polarcomplex128])
+def test_cast_polarcomplex(typ, pctyp):
+    pc = np.array([pctyp((2.0, 0.5)), pctyp((-3.0, 0.25))])
+    p = pc.astype(typ)
+    assert p.dtype == typ
+    assert_allclose([w.log_r for w in p], [math.log(2), math.log(3)],
+                    rtol=1e-7)
+    assert_allclose([w.theta for w in p], [0.5, 0.25 + np.pi], rtol=1e-7)
+    back = p.astype(pctyp)
+    assert back.dtype == pctyp
+    assert_allclose(back.astype(np.complex128), pc.astype(np.complex128),
+                    rtol=1e-6)
+
+
+@pytest.mark.parametrize('typ', [logpolarcomplex64, logpolarcomplex128])
+@pytest.mark.parametrize('pctyp', [polarcomplex64, polarcomplex128])
+def test_cast_polarcomplex_safety(typ, pctyp):
+    # The casts to polarcomplex can overflow, so they are not safe.
+    assert not np.can_cast(typ, pctyp)
+    safe = np.dtype(pctyp).itemsize <= np.dtype(typ).itemsize
+    assert np.can_cast(pctyp, typ) == safe
+    if safe:
+        assert np.result_type(typ, pctyp) == typ
+        assert np.result_type(pctyp, typ) == typ
+
+
+@pytest.mark.parametrize('typ, pctyp', [(logpolarcomplex64, polarcomplex64),
+                                        (logpolarcomplex128, polarcomplex128)])
+def test_polarcomplex_promotion_no_overflow(typ, pctyp):
+    lp = np.array([typ((138.0, 0.5))])
+    pc = np.array([pctyp((2.0, 0.25))])
+    c = np.concatenate([lp, pc])
+    assert c.dtype == typ
+    assert_allclose([w.log_r for w in c], [138.0, math.log(2)], rtol=1e-6)
+    z = pc * lp
+    assert z.dtype == typ
+    assert_allclose(z[0].log_r, 138.0 + math.log(2), rtol=1e-6)
+    assert_allclose(z[0].theta, 0.75, rtol=1e-6)
+
+
+def test_cast_between_logpolarcomplex_types():
+    p64 = np.array([logpolarcomplex64((-1000.0, 0.5))])
+    p128 = p64.astype(logpolarcomplex128)
+    assert p128[0].log_r == -1000.0
+    assert p128[0].theta == 0.5
+    assert np.can_cast(logpolarcomplex64, logpolarcomplex128)
+    assert not np.can_cast(logpolarcomplex128, logpolarcomplex64)
@@ -1,9 +1,12 @@
+import io
+import locale
 import pytest
 import operator
 import math
 import numpy as np
 from numpy.testing import assert_allclose, assert_equal
-from numtypes import logfloat32, logfloat64
+from numtypes import (logfloat, logfloat16, logfloat32, logfloat64,
+                      get_logadd_precision, set_logadd_precision)
 
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -11,14 +14,14 @@ from numtypes import logfloat32, logfloat64
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 @pytest.mark.parametrize('logvalue', [-np.inf, -2.5, 0, 0.5, np.inf])
 def test_log_value(typ, logvalue):
     lfx = typ(log=logvalue)
     assert lfx.log == logvalue
 
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 @pytest.mark.parametrize('op', [operator.add, operator.sub,
                                 operator.mul, operator.truediv,
                                 operator.pow])
@@ -33,7 +36,7 @@ def test_basic_binary_ops_for_scalars(typ, op):
                         rel_tol=2*np.finfo(lfz.log).resolution)
 
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 @pytest.mark.parametrize('op, logexpected',
                          [(operator.add, -999.9211102657074),
                           (operator.sub, -1000.085650483742),
@@ -75,7 +78,7 @@ def test_pow_for_scalars_extreme_big(typ):
                         rel_tol=25*np.finfo(lfz.log).resolution)
 
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 @pytest.mark.parametrize('op', [abs, operator.pos])
 def test_basic_unary_ops_for_scalars(typ, op):
     x = 3.0
@@ -87,7 +90,7 @@ def test_basic_unary_ops_for_scalars(typ, op):
     assert lfy == lfx
 
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 def test_bool_scalar(typ):
     assert bool(typ(0)) is False
     assert bool(typ(2.0)) is True
@@ -97,7 +100,7 @@ def test_bool_scalar(typ):
 # Test of array casting from and to logfloat32 and logfloat64
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 def test_basic_casting_from_logfloat(typ):
     x = np.array([typ(10), typ(1), typ(0.1), typ(0)])
     y = x.astype(np.float64)
@@ -105,7 +108,7 @@ def test_basic_casting_from_logfloat(typ):
     assert_allclose(y, [10, 1, 0.1, 0], rtol=rtol)
 
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 def test_basic_casting_from_double_to_logfloat(typ):
     x = np.array([10, 1, 0.1, 0])
     y = x.astype(typ)
@@ -115,7 +118,7 @@ def test_basic_casting_from_double_to_logfloat(typ):
     assert_allclose([t.log for t in y], expected_log, rtol=rtol)
 
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 @pytest.mark.parametrize('inttyp', [np.uint8, np.int8, np.uint16, np.int16,
                                     np.uint32, np.int32, np.uint64, np.int64])
 def test_basic_casting_from_int_to_logfloat(typ, inttyp):
@@ -131,7 +134,7 @@ def test_basic_casting_from_int_to_logfloat(typ, inttyp):
 # Tests of ufuncs on arrays with types logfloat32 and logfloat64
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 @pytest.mark.parametrize('ufunc', [np.square, np.sqrt, np.cbrt,
                                    np.sign, np.exp, np.exp2, np.expm1,
                                    np.reciprocal])
@@ -146,7 +149,7 @@ def test_basic_unary_ufuncs(typ, ufunc):
     assert_allclose([t.log for t in lfz], expected_log, rtol=rtol)
 
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 def test_basic_log_ufunc(typ):
     x = np.array([1.0, 1.5, 2.0, 10000.0])
     lfx = x.astype(typ)
@@ -158,7 +161,7 @@ def test_basic_log_ufunc(typ):
     assert_allclose([t.log for t in lfz], expected_log, rtol=rtol)
 
 
-@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
 @pytest.mark.parametrize('ufunc', [np.positive, np.absolute])
 def test_basic_unary_ufuncs_equal_check(typ, ufunc):
     x = np.array([0.0, 0.5, 1.0, 1.5, 2.0])
@@ -181,3 +184,268 @@ def test_basic_binary_ufuncs(typ, ufunc):
     assert lfz.dtype == typ
     rtol = 5*np.finfo(typ(1).log).resolution
     assert_allclose([t.log for t in lfz], np.log(ufunc(x, y)), rtol=rtol)
+
+
+@pytest.fixture
+def logadd_precision():
+    # Restore the add precision after a test changes it.
+    old = set_logadd_precision('full')
+    yield
+    set_logadd_precision(old)
+
+
+def random_logs(size, seed):
+    rng = np.random.default_rng(seed)
+    # Differences of the logs from 0 to beyond the end of the table.
+    return rng.uniform(-60, 5, size=size), rng.uniform(-60, 5, size=size)
+
+
+@pytest.mark.parametrize('ufunc, bound', [(np.add, 5e-7),
+                                          (np.subtract, 1.3e-6)])
+def test_logadd_fast_error_bound(ufunc, bound, logadd_precision):
+    logx, logy = random_logs(200000, 1234987)
+    if ufunc is np.subtract:
+        logx, logy = np.maximum(logx, logy), np.minimum(logx, logy)
+    x = logx.view(logfloat64)
+    y = logy.view(logfloat64)
+    full = ufunc(x, y).view(np.float64)
+    assert set_logadd_precision('fast') == 'full'
+    assert get_logadd_precision() == 'fast'
+    fast = ufunc(x, y).view(np.float64)
+    finite = np.isfinite(full)
+    assert_equal(np.isfinite(fast), finite)
+    err = np.abs(fast[finite] - full[finite])
+    assert err.max() <= bound + 1e-14*np.abs(full[finite]).max()
+    # The error bounds are not far from the actual maximum errors.
+    assert err.max() > bound/4
+
+
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
+@pytest.mark.parametrize('ufunc', [np.add, np.subtract])
+def test_logadd_fast_special_values(typ, ufunc, logadd_precision):
+    special = [-np.inf, np.inf, np.nan, 0.0, -1000.0, 2.5]
+    logx, logy = np.meshgrid(special, special)
+    ftype = np.dtype(typ().log).type
+    x = logx.ravel().astype(ftype).view(typ)
+    y = logy.ravel().astype(ftype).view(typ)
+    with np.errstate(invalid='ignore'):
+        full = ufunc(x, y).view(ftype)
+        set_logadd_precision('fast')
+        fast = ufunc(x, y).view(ftype)
+    assert_equal(fast, full)
+
+
+@pytest.mark.parametrize('typ, rtol', [(logfloat16, 2e-3),
+                                       (logfloat32, 2e-6),
+                                       (logfloat64, 5e-7)])
+def test_logadd_fast_reduce_and_accumulate(typ, rtol, logadd_precision):
+    ftype = np.dtype(typ().log).type
+    rng = np.random.default_rng(9912834)
+    logs = rng.uniform(-5, 5, size=(4, 401)).astype(ftype)
+    x = logs.view(typ)
+    expected = np.logaddexp.reduce(logs.astype(np.float64), axis=1)
+    # (The arrays are short, because np.add.accumulate crashes with long
+    # 1-d arrays of user-defined dtypes in NumPy 1.26.)
+    full_accumulate = np.add.accumulate(x[0]).view(ftype)
+    set_logadd_precision('fast')
+    s = np.add.reduce(x, axis=1).view(ftype)
+    assert_allclose(s, expected, rtol=rtol)
+    # A reduction of a single row, and one with the initial value and a
+    # length that is not a multiple of 4.
+    assert_allclose(np.add.reduce(x[0]).log, expected[0], rtol=rtol)
+    s = np.add.reduce(x[0, :398], initial=x[0, 398])
+    assert_allclose(s.log, np.logaddexp.reduce(logs[0, :399], dtype=np.float64),
+                    rtol=rtol)
+    # Each step of accumulate rounds to the precision of the type.
+    a = np.add.accumulate(x[0]).view(ftype)
+    assert_allclose(a, full_accumulate, rtol=rtol)
+    assert_equal(np.add.reduce(np.array([], dtype=typ)).log, -np.inf)
+    nan_row = x[1].copy()
+    nan_row[37] = typ(log=np.nan)
+    with np.errstate(invalid='ignore'):
+        assert math.isnan(np.add.reduce(nan_row).log)
+
+
+def test_logadd_fast_scalars_unaffected(logadd_precision):
+    x = logfloat64(log=-1.0)
+    y = logfloat64(log=-1.3)
+    full = (x + y, x - y)
+    set_logadd_precision('fast')
+    assert (x + y, x - y) == full
+    assert (x + y).log == np.logaddexp(-1.0, -1.3)
+
+
+def test_set_logadd_precision_bad_value(logadd_precision):
+    with pytest.raises(ValueError,
+                       match="precision must be one of 'full', 'fast'"):
+        set_logadd_precision('medium')
+    with pytest.raises(ValueError,
+                       match="precision must be one of 'full', 'fast'"):
+        set_logadd_precision(1)
+    assert get_logadd_precision() == 'full'
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# Tests specific to logfloat16
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+def test_logfloat16_storage():
+    x = np.array([logfloat16(log=-1000), logfloat16(log=-1001.5)])
+    assert x.dtype == logfloat16
+    assert x.dtype.itemsize == 2
+    assert x.view(np.float16).tolist() == [-1000.0, -1001.5]
+    # The scalar holds the value rounded to half precision.
+    assert logfloat16(log=0.1).log == np.float16(0.1)
+    assert logfloat16(log=0.1).log.dtype == np.float16
+
+
+@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+def test_logfloat16_casts(typ):
+    logs = np.array([-1000.0, -2.5, 0.0, 3.0, -np.inf], dtype=np.float16)
+    lf16 = logs.view(logfloat16)
+    lf = lf16.astype(typ)
+    assert lf.dtype == typ
+    assert_equal([t.log for t in lf], logs)
+    assert_equal(lf.astype(logfloat16).view(np.float16), logs)
+    assert np.can_cast(logfloat16, typ)
+
+
+def test_logfloat16_float16_casts():
+    h = np.array([0.0, 0.5, 2.0, 1000.0], dtype=np.float16)
+    lf = h.astype(logfloat16)
+    with np.errstate(divide='ignore'):
+        assert_equal(lf.view(np.float16), np.log(h))
+    assert_allclose(lf.astype(np.float16), h, rtol=2e-3)
+    assert_allclose(np.array([1.5, 3], dtype=logfloat64).astype(np.float16),
+                    [1.5, 3.0], rtol=1e-3)
+
+
+def test_logfloat16_computes_in_float32():
+    # Each operation rounds only its result to half precision.
+    x = np.array([-1000.0, -1001.5], dtype=np.float16).view(logfloat16)
+    z = np.add(x, x)
+    expected = np.float16(np.logaddexp(np.float32([-1000.0, -1001.5]),
+                                       np.float32([-1000.0, -1001.5])))
+    assert_equal(z.view(np.float16), expected)
+    s = np.add.reduce(x)
+    assert s.log == np.float16(np.logaddexp(np.float32(-1000.0),
+                                            np.float32(-1001.5)))
+
+
+@pytest.mark.parametrize('precision', ['full', 'fast'])
+def test_logfloat16_add_reduce_computes_in_float32(precision, logadd_precision):
+    # The running sum is kept in float32, so it isn't rounded to half
+    # precision after each element.
+    set_logadd_precision(precision)
+    x = np.ones(10000).astype(logfloat16)
+    assert_allclose(x.sum().log, np.log(10000), rtol=1e-3)
+    rng = np.random.default_rng(12309)
+    logs = rng.uniform(-5, 5, size=300000).astype(np.float16)
+    s = np.add.reduce(logs.view(logfloat16))
+    expected = np.logaddexp.reduce(logs.astype(np.float64))
+    assert_allclose(s.log, expected, rtol=1e-3)
+    s = np.subtract.reduce(x, initial=logfloat16(log=np.log(20000)))
+    assert_allclose(s.log, np.log(10000), rtol=1e-3)
+
+
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
+def test_fromstring(typ):
+    a = np.fromstring('0.25, 2, log=-1000.5, 0, LOG=3', dtype=typ, sep=',')
+    ftype = np.dtype(typ().log).type
+    expected = [np.log(0.25), np.log(2.0), -1000.5, -np.inf, 3.0]
+    assert_allclose([z.log for z in a], np.array(expected, dtype=ftype),
+                    rtol=1e-3 if typ is logfloat16 else 1e-7)
+
+
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
+def test_loadtxt(typ):
+    a = np.loadtxt(io.StringIO('1 log=-800\n0.5 nan\n'), dtype=typ)
+    assert a.shape == (2, 2)
+    assert a[0, 0].log == 0
+    assert a[0, 1].log == -800
+    assert math.isnan(a[1, 1].log)
+    with pytest.raises(ValueError):
+        np.loadtxt(io.StringIO('log=\n'), dtype=typ)
+
+
+def test_fromfile_text(tmp_path):
+    path = tmp_path / 'a.txt'
+    path.write_text('log=-2000 1.0\nlog=5e2\n')
+    a = np.fromfile(path, dtype=logfloat64, sep=' ')
+    assert_equal([z.log for z in a], [-2000.0, 0.0, 500.0])
+
+
+def test_setitem_str():
+    a = np.zeros(2, dtype=logfloat64)
+    a[0] = ' log=-1e4 '
+    a[1] = '4'
+    assert a[0].log == -1e4
+    assert a[1].log == math.log(4)
+    with pytest.raises(ValueError, match='could not convert string'):
+        a[0] = 'log=1 2'
+
+
+@pytest.fixture
+def decimal_comma_locale():
+    # Set LC_NUMERIC to a locale whose decimal point is ',' (if one is
+    # installed), and restore it after the test.
+    old = locale.setlocale(locale.LC_NUMERIC)
+    for name in ['de_DE.UTF-8', 'de_DE.utf8', 'de_DE', 'fr_FR.UTF-8',
+                 'fr_FR.utf8', 'fr_FR']:
+        try:
+            locale.setlocale(locale.LC_NUMERIC, name)
+        except locale.Error:
+            continue
+        if locale.localeconv()['decimal_point'] == ',':
+            break
+    else:
+        locale.setlocale(locale.LC_NUMERIC, old)
+        pytest.skip('no locale with a decimal comma')
+    yield
+    locale.setlocale(locale.LC_NUMERIC, old)
+
+
+def test_text_parsing_ignores_locale(decimal_comma_locale, tmp_path):
+    a = np.fromstring('0.25 log=-1.5', dtype=logfloat64, sep=' ')
+    assert_equal([z.log for z in a], [math.log(0.25), -1.5])
+    path = tmp_path / 'a.txt'
+    path.write_text('log=2.75\n')
+    assert np.fromfile(path, dtype=logfloat64, sep=' ')[0].log == 2.75
+    a = np.zeros(1, dtype=logfloat64)
+    a[0] = 'log=-3.5'
+    assert a[0].log == -3.5
+
+
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
+def test_from_python_logfloat(typ):
+    # The logs are copied, so values outside the range of float64 are
+    # not lost.
+    values = [logfloat(log=-1000), logfloat(log=2000), logfloat(0),
+              logfloat(log=-0.5)]
+    expected = [-1000.0, 2000.0, -math.inf, -0.5]
+    for a in [np.array(values, dtype=typ),
+              np.fromiter(values, dtype=typ),
+              np.array(values, dtype=object).astype(typ)]:
+        assert a.dtype == typ
+        assert_equal([z.log for z in a], expected)
+    a = np.zeros(1, dtype=typ)
+    a[0] = values[0]
+    assert a[0].log == -1000.0
+    assert typ(values[0]).log == -1000.0
+    assert typ(values[0]) == values[0]
+    assert typ(values[0]) != logfloat(log=-1001)
+    assert (a[0] * values[0]).log == -2000.0
+
+
+@pytest.mark.parametrize('typ, ftyp', [(logfloat16, np.float16),
+                                       (logfloat32, np.float32),
+                                       (logfloat64, np.float64)])
+def test_to_python_logfloat(typ, ftyp):
+    a = np.array([-1000.0, 2000.0, -np.inf, -0.5], dtype=ftyp).view(typ)
+    values = [logfloat(z) for z in a.tolist()]
+    assert all(type(z) is logfloat for z in values)
+    assert [z.log for z in values] == [-1000.0, 2000.0, -math.inf, -0.5]
+    assert values[0] == a[0]
+    assert values[0] != a[1]
+    assert (values[0] * a[0]).log == -2000.0
+    assert (values[0] + a[0]).log == -1000.0 + math.log(2)
@@ -0,0 +1,148 @@
+# The binary ufunc loops have specialized versions for contiguous data
+# and for a scalar (stride 0) operand.  These tests check that every
+# layout gives exactly the same result as the general strided loop.
+
+import pytest
+import numpy as np
+from numpy.testing import assert_equal
+from numtypes import (nint32, polarcomplex64, polarcomplex128,
+                      logpolarcomplex64, logpolarcomplex128,
+                      logfloat16, logfloat32, logfloat64,
+                      slogfloat32, slogfloat64, set_logadd_precision)
+
+
+n = 37
+
+comparisons = [np.less, np.less_equal, np.greater, np.greater_equal,
+               np.equal, np.not_equal]
+
+
+def data(typ, seed):
+    rng = np.random.default_rng(seed)
+    if typ is nint32:
+        x = rng.integers(-1000, 1000, size=n)
+        x[x == 0] = 1
+        x = x.astype(nint32)
+        x[5] = np.nan
+        return x
+    if typ in (np.float32, np.float64):
+        return rng.uniform(-3, 3, size=n).astype(typ)
+    if typ in (polarcomplex64, polarcomplex128,
+               logpolarcomplex64, logpolarcomplex128):
+        z = rng.normal(size=n) + 1j*rng.normal(size=n)
+        return z.astype(typ)
+    x = rng.uniform(-5, 5, size=n)
+    if typ in (logfloat16, logfloat32, logfloat64):
+        x = np.abs(x)
+        x[3] = 0
+        x[4] = np.inf
+    x[5] = np.nan
+    return x.astype(typ)
+
+
+def strided(a):
+    # A copy of a with stride 2*itemsize, so the general loop is used.
+    b = np.empty(2*len(a), dtype=a.dtype)[::2]
+    b[...] = a
+    return b
+
+
+def raw(a):
+    # The bytes of the values, for exact comparison (nan == nan, etc).
+    a = np.ascontiguousarray(a)
+    if a.dtype.type in (slogfloat32, slogfloat64):
+        # Skip the padding after the sign.
+        ftype = np.float32 if a.dtype.type is slogfloat32 else np.float64
+        fields = a.view(np.dtype({'names': ['log', 'sign'],
+                                  'formats': [ftype, 'i1'],
+                                  'offsets': [0, np.dtype(ftype).itemsize],
+                                  'itemsize': a.itemsize}))
+        return (fields['log'].copy().view(np.uint8), fields['sign'])
+    return a.view(np.uint8)
+
+
+cases = (
+    [(typ, typ, f) for typ in (logfloat16, logfloat32, logfloat64)
+     for f in [np.add, np.subtract, np.multiply, np.true_divide, np.power,
+               np.minimum, np.maximum] + comparisons]
+    + [(typ, typ, f) for typ in (slogfloat32, slogfloat64)
+       for f in [np.add, np.subtract, np.multiply, np.true_divide,
+                 np.minimum, np.maximum] + comparisons]
+    + [(nint32, nint32, f) for f in [np.add, np.subtract, np.multiply,
+                                     np.floor_divide, np.minimum,
+                                     np.maximum]]
+    + [(typ, typ, f) for typ in (polarcomplex64, polarcomplex128)
+       for f in [np.add, np.subtract, np.multiply, np.divide, np.equal,
+                 np.not_equal]]
+    + [(typ, typ, f) for typ in (logpolarcomplex64, logpolarcomplex128)
+       for f in [np.add, np.subtract, np.multiply, np.divide]]
+    + [(polarcomplex64, np.float32, np.power),
+       (polarcomplex128, np.float64, np.power),
+       (logpolarcomplex64, np.float32, np.power),
+       (logpolarcomplex128, np.float64, np.power)]
+)
+
+
+@pytest.mark.parametrize('typ0, typ1, f', cases)
+def test_layouts(typ0, typ1, f):
+    x = data(typ0, 1)
+    y = data(typ1, 2)
+    with np.errstate(all='ignore'):
+        expected = f(strided(x), strided(y))
+        assert_equal(raw(f(x, y)), raw(expected))
+        # A scalar second operand.
+        expected = f(strided(x), strided(np.full(n, y[0], dtype=y.dtype)))
+        assert_equal(raw(f(x, y[0])), raw(expected))
+        assert_equal(raw(f(x, np.broadcast_to(y[:1], n))), raw(expected))
+        # A scalar first operand.
+        expected = f(strided(np.full(n, x[1], dtype=x.dtype)), strided(y))
+        assert_equal(raw(f(x[1], y)), raw(expected))
+        # In place.
+        if expected.dtype == x.dtype:
+            expected = f(strided(x), strided(y))
+            out = x.copy()
+            f(out, y, out=out)
+            assert_equal(raw(out), raw(expected))
+
+
+@pytest.mark.parametrize('f', [np.add, np.subtract])
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
+def test_layouts_fast(typ, f):
+    old = set_logadd_precision('fast')
+    try:
+        test_layouts(typ, typ, f)
+    finally:
+        set_logadd_precision(old)
+
+
+@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+def test_power_scalar_exponent(typ):
+    # The exponent exp(log2) is computed once for a scalar exponent.
+    x = data(typ, 3)
+    for p in [0.0, 0.5, 2.0, np.inf, np.nan]:
+        expected = np.array([xk**typ(p) for xk in x], dtype=typ)
+        with np.errstate(invalid='ignore'):
+            assert_equal(raw(x**typ(p)), raw(expected))
+
+
+def test_nint32_scalar_overflow():
+    x = np.array([1, -5, 2**31 - 10], dtype=nint32)
+    with pytest.raises(RuntimeError, match='overflow'):
+        x + nint32(100)
+    with pytest.raises(RuntimeError, match='overflow'):
+        nint32(2**31 - 1) + x[::-1].copy()
+
+
+@pytest.mark.parametrize('typ', [logfloat32, slogfloat64, nint32,
+                                 polarcomplex128])
+def test_accumulate(typ):
+    # An accumulation passes the previous output as the first input, so
+    # the contiguous loop must read it after it is written.
+    x = data(typ, 4)[6:16]
+    with np.errstate(all='ignore'):
+        f = np.multiply if typ is not nint32 else np.maximum
+        acc = f.accumulate(x)
+        expected = [x[0]]
+        for xk in x[1:]:
+            expected.append(f(expected[-1], xk))
+    assert_equal(raw(acc), raw(np.array(expected, dtype=x.dtype)))
@@ -1,9 +1,13 @@
 
+import io
 import pytest
 import math
 import numpy as np
 from numpy.testing import assert_equal
-from numtypes import nint32
+from numtypes import (nint32, get_nint32_cast_policy, set_nint32_cast_policy,
+                      nint32_unique, nint32_value_counts, nint32_groupby_sum,
+                      parse_nint32, format_nint32, take_nullable)
+from numtypes import logfloat64, slogfloat32
 
 
 def test_basic():
@@ -111,3 +115,275 @@ def test_extreme_method_with_nan(methodname):
     m = getattr(a, methodname)()
     assert m.dtype == nint32
     assert np.isnan(m)
+
+
+@pytest.fixture
+def cast_policy():
+    # Restore the cast policy after a test changes it.
+    old = set_nint32_cast_policy('error')
+    yield
+    set_nint32_cast_policy(old)
+
+
+@pytest.mark.parametrize('typ', [np.float32, np.float64])
+def test_cast_float_with_nan(typ, cast_policy):
+    x = np.array([1.5, np.nan, -3.75, 0.0, 12345.0], dtype=typ)
+    a = x.astype(nint32)
+    assert a.dtype == nint32
+    assert_equal(a.astype(np.int32), [1, -2**31, -3, 0, 12345])
+
+
+@pytest.mark.parametrize('typ', [np.float32, np.float64])
+@pytest.mark.parametrize('policy, expected',
+                         [('nan', [-2**31, -2**31, 7, -2**31, -2**31]),
+                          ('clip', [2**31 - 1, -2**31 + 1, 7,
+                                    2**31 - 1, -2**31 + 1])])
+def test_cast_float_out_of_range(typ, cast_policy, policy, expected):
+    set_nint32_cast_policy(policy)
+    assert get_nint32_cast_policy() == policy
+    x = np.array([1e10, -1e10, 7, np.inf, -np.inf], dtype=typ)
+    a = x.astype(nint32)
+    assert_equal(a.astype(np.int32), expected)
+
+
+@pytest.mark.parametrize('typ', [np.float64, np.int64, np.uint32, np.uint64])
+def test_cast_out_of_range_error(typ, cast_policy):
+    x = np.array([1, 2**31], dtype=typ)
+    with pytest.raises(OverflowError, match='out of range'):
+        x.astype(nint32)
+
+
+@pytest.mark.parametrize('typ, values',
+                         [(np.int64, [2**40, -2**31, 5, -2**31 + 1]),
+                          (np.uint32, [2**31, 2**32 - 1, 5, 2**31 - 1]),
+                          (np.uint64, [2**63, 2**31, 5, 2**31 - 1])])
+def test_cast_int_out_of_range_nan(typ, values, cast_policy):
+    set_nint32_cast_policy('nan')
+    a = np.array(values, dtype=typ).astype(nint32)
+    assert_equal(np.isnan(a.astype(np.float64)), [True, True, False, False])
+    assert_equal(a[2:].astype(np.int64), values[2:])
+
+
+@pytest.mark.parametrize('typ', [np.int64, np.uint32, np.uint64])
+def test_no_promotion_of_wider_ints(typ):
+    # The casts to nint32 are not safe, so the types are not promoted.
+    assert not np.can_cast(typ, nint32)
+    with pytest.raises(TypeError):
+        np.result_type(typ, nint32)
+    # Mixed expressions don't cast the wider type to nint32 (which would
+    # overflow); NumPy uses a float64 loop instead.
+    big = 2**31 if typ == np.uint32 else 2**40
+    r = np.array([big], dtype=typ) + np.array([1], dtype=nint32)
+    assert r.dtype != nint32
+    assert_equal(r, [big + 1])
+
+
+def test_set_cast_policy_bad_value(cast_policy):
+    with pytest.raises(ValueError, match="policy must be one of 'error', "
+                                         "'nan', 'clip', not 'wrap'"):
+        set_nint32_cast_policy('wrap')
+    assert get_nint32_cast_policy() == 'error'
+
+
+def test_unique():
+    a = np.array([5, 3, np.nan, 5, -1, 3, 5, np.nan], dtype=nint32)
+    u, inv, counts = nint32_unique(a, return_inverse=True, return_counts=True)
+    assert u.dtype == nint32
+    assert_equal(u.astype(np.int32), [-1, 3, 5, -2**31])
+    assert_equal(inv, [2, 1, 3, 2, 0, 1, 2, 3])
+    assert_equal(counts, [1, 2, 3, 2])
+
+
+def test_unique_dropnan():
+    a = np.array([np.nan, 7, 7, np.nan], dtype=nint32)
+    u, inv = nint32_unique(a, return_inverse=True, dropnan=True)
+    assert_equal(u.astype(np.int32), [7])
+    assert_equal(inv, [-1, 0, 0, -1])
+
+
+def test_unique_matches_numpy():
+    rng = np.random.default_rng(121263137472525314065)
+    x = rng.integers(-5000, 5000, size=(200, 50)).astype(np.int32)
+    u, inv, counts = nint32_unique(x.astype(nint32), return_inverse=True,
+                                   return_counts=True)
+    u2, inv2, counts2 = np.unique(x, return_inverse=True, return_counts=True)
+    assert_equal(u.astype(np.int32), u2)
+    assert_equal(inv, inv2.ravel())
+    assert_equal(counts, counts2)
+
+
+def test_value_counts():
+    a = np.array([1, 2, 2, np.nan, 3, 3, 3, np.nan, 2], dtype=nint32)
+    values, counts = nint32_value_counts(a)
+    assert_equal(values.astype(np.int32), [2, 3, -2**31, 1])
+    assert_equal(counts, [3, 3, 2, 1])
+
+
+@pytest.mark.parametrize('dropnan, expected_keys, expected_sums',
+                         [(False, [-1, 3, 5, -2**31], [4, 6, 9, 9]),
+                          (True, [-1, 3, 5], [4, 6, 9])])
+def test_groupby_sum(dropnan, expected_keys, expected_sums):
+    keys = np.array([5, 3, np.nan, 5, -1, 3, 5, np.nan], dtype=nint32)
+    values = np.arange(8)
+    k, s = nint32_groupby_sum(keys, values, dropnan=dropnan)
+    assert_equal(k.astype(np.int32), expected_keys)
+    assert s.dtype == np.float64
+    assert_equal(s, expected_sums)
+
+
+def test_groupby_sum_shape_mismatch():
+    keys = np.array([1, 2, 3], dtype=nint32)
+    with pytest.raises(ValueError, match='same shape'):
+        nint32_groupby_sum(keys, [1.0, 2.0])
+
+
+@pytest.mark.parametrize('values', [np.arange(5.0),
+                                    np.arange(5).astype(np.float32),
+                                    np.arange(5).astype(nint32),
+                                    np.arange(5).astype(logfloat64),
+                                    np.arange(5).astype(slogfloat32),
+                                    np.arange(5.0).astype('>f8'),
+                                    np.arange(5).astype('M8[D]')])
+def test_take_nullable(values):
+    idx = np.array([3, np.nan, 0, -1, np.nan, 3], dtype=nint32)
+    r = take_nullable(values, idx)
+    assert r.dtype == values.dtype
+    mask = np.isnan(idx)
+    assert_equal(r[~mask], values[[3, 0, -1, 3]])
+    # The default fill is the nan of the dtype.
+    assert np.isnan(r[mask]).all()
+
+
+def test_take_nullable_fill():
+    idx = np.array([[1, np.nan], [np.nan, 0]], dtype=nint32)
+    r = take_nullable(np.array([10, 20, 30]), idx, fill=-1)
+    assert_equal(r, [[20, -1], [-1, 10]])
+    r = take_nullable(np.array(['a', 'bc']), idx, fill='')
+    assert_equal(r, [['bc', ''], ['', 'a']])
+    r = take_nullable(np.array([[1], 'x'], dtype=object), idx)
+    assert r.tolist() == [['x', None], [None, [1]]]
+    with pytest.raises(ValueError, match='no nan'):
+        take_nullable(np.array([10, 20, 30]), idx)
+    with pytest.raises(ValueError, match='scalar'):
+        take_nullable(np.arange(3.0), idx, fill=[1.0, 2.0])
+
+
+@pytest.mark.parametrize('axis', [0, 1, 2, -1])
+def test_take_nullable_axis(axis):
+    values = np.arange(60.0).reshape(3, 4, 5)
+    idx = np.array([2, np.nan, 0], dtype=nint32)
+    r = take_nullable(values, idx, axis=axis, fill=-1.0)
+    expected = np.take(values, [2, 0, 0], axis=axis)
+    np.moveaxis(expected, axis, 0)[1] = -1.0
+    assert_equal(r, expected)
+    # A noncontiguous array of values.
+    r = take_nullable(values[:, ::-1], idx, axis=axis, fill=-1.0)
+    expected = np.take(values[:, ::-1], [2, 0, 0], axis=axis)
+    np.moveaxis(expected, axis, 0)[1] = -1.0
+    assert_equal(r, expected)
+
+
+def test_take_nullable_flattened():
+    values = np.arange(6.0).reshape(2, 3)
+    idx = np.array([5, np.nan, 1], dtype=nint32)
+    assert_equal(take_nullable(values, idx), [5.0, np.nan, 1.0])
+    assert take_nullable(values, idx[:0]).shape == (0,)
+
+
+@pytest.mark.parametrize('index', [3, -4, 2**31 - 1])
+def test_take_nullable_out_of_bounds(index):
+    idx = np.array([0, np.nan, index], dtype=nint32)
+    with pytest.raises(IndexError, match=f'index {index} is out of bounds'):
+        take_nullable(np.arange(3.0), idx)
+    # Only nan can be taken from an empty axis.
+    assert np.isnan(take_nullable(np.zeros(0), idx[1:2])).all()
+    with pytest.raises(IndexError):
+        take_nullable(np.zeros(0), idx[:1])
+
+
+def strs(a):
+    return [str(z) for z in a]
+
+
+def test_setitem_str():
+    a = np.zeros(3, dtype=nint32)
+    a[0] = ' -42 '
+    a[1] = 'NaN'
+    a[2] = '+7'
+    assert strs(a) == ['-42', 'nan', '7']
+    with pytest.raises(ValueError, match='could not convert string'):
+        a[0] = '1.5'
+    with pytest.raises(OverflowError):
+        a[0] = '-2147483648'
+
+
+def test_loadtxt():
+    text = "1, nan, -3\n4, 5, 2147483647\n"
+    a = np.loadtxt(io.StringIO(text), dtype=nint32, delimiter=',')
+    assert a.shape == (2, 3)
+    assert strs(a.ravel()) == ['1', 'nan', '-3', '4', '5', '2147483647']
+
+
+@pytest.mark.parametrize('sep', [',', ' '])
+def test_fromstring(sep):
+    a = np.fromstring(sep.join(['12', '-NAN', '0', '-5']), dtype=nint32,
+                      sep=sep)
+    assert strs(a) == ['12', 'nan', '0', '-5']
+
+
+def test_fromfile_text(tmp_path):
+    path = tmp_path / 'a.txt'
+    path.write_text('5\n-7\nnan\n2147483647\n')
+    for dt in [np.dtype(nint32), np.dtype(nint32).newbyteorder('S')]:
+        a = np.fromfile(path, dtype=dt, sep='\n')
+        assert a.dtype == dt
+        assert strs(a) == ['5', '-7', 'nan', '2147483647']
+
+
+@pytest.mark.parametrize('buffer_type', [bytes, bytearray, memoryview])
+def test_parse_nint32(buffer_type):
+    a = parse_nint32(buffer_type(b' 1  -2\n\tnan 2147483647\n'))
+    assert a.dtype == nint32
+    assert strs(a) == ['1', '-2', 'nan', '2147483647']
+    assert parse_nint32(b'').shape == (0,)
+
+
+def test_parse_nint32_sep():
+    a = parse_nint32(b'1,,3\r\n4, NaN ,6\n\n7,8,\n', sep=',')
+    assert strs(a) == ['1', 'nan', '3', '4', 'nan', '6', 'nan',
+                       '7', '8', 'nan']
+    a = parse_nint32(b'1\t2\n3\t\n', sep='\t')
+    assert strs(a) == ['1', '2', '3', 'nan']
+
+
+@pytest.mark.parametrize('text, sep, exc, offset',
+                         [(b'1,x', ',', ValueError, 2),
+                          (b'1 2x', None, ValueError, 2),
+                          (b'1;2', ',', ValueError, 1),
+                          (b'1,99999999999', ',', OverflowError, 2),
+                          (b'-2147483648', None, OverflowError, 0)])
+def test_parse_nint32_errors(text, sep, exc, offset):
+    with pytest.raises(exc, match=f'at offset {offset} '):
+        parse_nint32(text, sep=sep)
+
+
+@pytest.mark.parametrize('sep', ['', 'ab', '1', '\n', '-'])
+def test_parse_nint32_bad_sep(sep):
+    with pytest.raises(ValueError, match='sep must be'):
+        parse_nint32(b'1', sep=sep)
+
+
+def test_format_nint32():
+    a = np.array([[1, np.nan, -2147483647], [0, 10, 2147483647]],
+                 dtype=nint32)
+    text = format_nint32(a)
+    assert text == b'1,nan,-2147483647\n0,10,2147483647\n'
+    assert format_nint32(a, sep=' | ', na_rep='NA').startswith(b'1 | NA | ')
+    assert_equal(parse_nint32(text, sep=',').reshape(2, 3).view(np.int32),
+                 a.view(np.int32))
+    b = np.array([3, np.nan, -1], dtype=nint32)
+    text = format_nint32(b, na_rep='')
+    assert text == b'3\n\n-1\n'
+    assert_equal(parse_nint32(text, sep=',').view(np.int32), b.view(np.int32))
+    with pytest.raises(ValueError, match='one- or two-dimensional'):
+        format_nint32(np.zeros((1, 1, 1), dtype=nint32))
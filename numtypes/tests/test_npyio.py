@@ -0,0 +1,147 @@
+
+import pickle
+import pytest
+import numpy as np
+from numpy.testing import assert_equal
+from numtypes import (nint32, polarcomplex64, polarcomplex128,
+                      logpolarcomplex64, logpolarcomplex128,
+                      logfloat, logfloat16, logfloat32, logfloat64,
+                      slogfloat32, slogfloat64)
+from numtypes.npyio import save, load
+
+
+all_types = [nint32, polarcomplex64, polarcomplex128,
+             logpolarcomplex64, logpolarcomplex128,
+             logfloat16, logfloat32, logfloat64, slogfloat32, slogfloat64]
+
+
+def sample(typ):
+    if typ is nint32:
+        return np.array([[1, np.nan, -3], [4, 5, 2**31 - 1]], dtype=nint32)
+    x = np.array([[0.5, 2.0, 3.0], [4.0, 1e-3, 10.0]])
+    if typ in (slogfloat32, slogfloat64):
+        x[0, 1] = -x[0, 1]
+    return x.astype(typ)
+
+
+def raw(a):
+    # The bytes of the array, for exact comparison (nan == nan, etc).
+    return np.ascontiguousarray(a).view(np.uint8)
+
+
+@pytest.mark.parametrize('typ', all_types)
+def test_pickle_dtype(typ):
+    dt = pickle.loads(pickle.dumps(np.dtype(typ)))
+    assert dt == np.dtype(typ)
+
+
+@pytest.mark.parametrize('typ', all_types)
+@pytest.mark.parametrize('protocol', [2, pickle.HIGHEST_PROTOCOL])
+def test_pickle_array(typ, protocol):
+    a = sample(typ)
+    b = pickle.loads(pickle.dumps(a, protocol=protocol))
+    assert b.dtype == typ
+    assert_equal(raw(b), raw(a))
+    c = pickle.loads(pickle.dumps(a[:, ::2].T, protocol=protocol))
+    assert_equal(raw(c), raw(a[:, ::2].T))
+
+
+@pytest.mark.parametrize('typ', all_types)
+def test_pickle_scalar(typ):
+    x = sample(typ)[1, 0]
+    y = pickle.loads(pickle.dumps(x))
+    assert type(y) is typ
+    assert_equal(raw(np.array([y], dtype=typ)), raw(np.array([x], dtype=typ)))
+
+
+def test_pickle_python_logfloat():
+    x = logfloat(log=-1200.5)
+    y = pickle.loads(pickle.dumps(x))
+    assert type(y) is logfloat
+    assert y.log == x.log
+
+
+@pytest.mark.parametrize('typ', all_types)
+def test_save_load(tmp_path, typ):
+    a = sample(typ)
+    path = tmp_path / 'a.npy'
+    save(path, a)
+    b = load(path)
+    assert b.dtype == typ
+    assert_equal(raw(b), raw(a))
+    # Plain np.load gives the storage layout of the type.
+    c = np.load(path)
+    assert c.dtype.names == (f'numtypes.{typ.__name__}',)
+    assert_equal(raw(c), raw(a))
+
+
+@pytest.mark.parametrize('typ', all_types)
+def test_load_mmap(tmp_path, typ):
+    a = sample(typ)
+    path = tmp_path / 'a.npy'
+    save(path, a)
+    b = load(path, mmap_mode='r')
+    assert isinstance(b, np.memmap)
+    assert b.dtype == typ
+    assert_equal(raw(b), raw(a))
+
+
+def test_load_mmap_write(tmp_path):
+    path = tmp_path / 'a.npy'
+    save(path, np.zeros(4, dtype=logfloat32))
+    b = load(path, mmap_mode='r+')
+    b[2] = logfloat32(log=-1000)
+    b.flush()
+    del b
+    assert load(path)[2].log == np.float32(-1000)
+
+
+def test_save_fortran_order(tmp_path):
+    a = np.asfortranarray(sample(nint32))
+    path = tmp_path / 'a.npy'
+    save(path, a)
+    b = load(path)
+    assert b.flags.f_contiguous
+    assert_equal(b.astype(np.int64), a.astype(np.int64))
+
+
+@pytest.mark.parametrize('typ', all_types)
+def test_load_byteswapped(tmp_path, typ):
+    path = tmp_path / 'a.npy'
+    a = sample(typ)
+    save(path, a)
+    c = np.load(path)
+    np.save(path, c.astype(c.dtype.newbyteorder('S')))
+    b = load(path, mmap_mode='r')
+    # The data is viewed in the byte order of the file, not converted.
+    assert isinstance(b, np.memmap)
+    assert b.dtype == np.dtype(typ).newbyteorder('S')
+    assert_equal([str(z) for z in b.ravel()], [str(z) for z in a.ravel()])
+    assert b.astype(typ).dtype.isnative
+
+
+@pytest.mark.parametrize('typ', all_types)
+def test_save_byteswapped(tmp_path, typ):
+    path = tmp_path / 'a.npy'
+    a = sample(typ)
+    save(path, a.astype(np.dtype(typ).newbyteorder('S')))
+    assert not np.load(path).dtype[0].isnative
+    b = load(path)
+    assert_equal([str(z) for z in b.ravel()], [str(z) for z in a.ravel()])
+
+
+def test_save_builtin(tmp_path):
+    path = tmp_path / 'a.npy'
+    a = np.arange(5.0)
+    save(path, a)
+    assert_equal(load(path), a)
+
+
+def test_memmap(tmp_path):
+    path = tmp_path / 'a.dat'
+    m = np.memmap(path, dtype=nint32, mode='w+', shape=(3,))
+    m[:] = [1, np.nan, 3]
+    m.flush()
+    del m
+    m = np.memmap(path, dtype=nint32, mode='r')
+    assert_equal(np.isnan(m.astype(np.float64)), [False, True, False])
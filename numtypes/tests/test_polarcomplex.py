@@ -1,8 +1,13 @@
 # Just a few tests at the moment.
 
+import io
 import math
 import pytest
-from numtypes import polarcomplex64, polarcomplex128
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal
+from numtypes import (polarcomplex64, polarcomplex128, polar_angle, polar_fields,
+                      get_polarcomplex_add_precision,
+                      set_polarcomplex_add_precision)
 
 
 @pytest.mark.parametrize('typ, atol, rtol',
@@ -78,3 +83,287 @@ def test_float_and_int_raise_typerror(func, typ):
     match = f"can't convert {typ.__name__} to {func.__name__}"
     with pytest.raises(TypeError, match=match):
         func(z)
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# Tests of ufuncs on arrays with types polarcomplex64 and polarcomplex128
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+z1 = np.array([1 + 2j, -3 + 0.5j, -2 - 2j, 0.25j])
+z2 = np.array([3 - 1j, 2 + 2j, -0.5 + 1j, 4.0])
+
+typ_rtol = [(polarcomplex64, 2e-6), (polarcomplex128, 5e-15)]
+real_type = {polarcomplex64: np.float32, polarcomplex128: np.float64}
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+@pytest.mark.parametrize('ufunc', [np.add, np.subtract, np.multiply,
+                                   np.true_divide])
+def test_binary_ufuncs(typ, rtol, ufunc):
+    p = ufunc(z1.astype(typ), z2.astype(typ))
+    assert p.dtype == typ
+    assert_allclose(p.astype(np.complex128), ufunc(z1, z2), rtol=rtol)
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+@pytest.mark.parametrize('ufunc', [np.negative, np.positive, np.conjugate,
+                                   np.reciprocal, np.square, np.sqrt,
+                                   np.exp, np.log])
+def test_unary_ufuncs(typ, rtol, ufunc):
+    p = ufunc(z1.astype(typ))
+    assert p.dtype == typ
+    assert_allclose(p.astype(np.complex128), ufunc(z1), rtol=rtol)
+
+
+@pytest.fixture
+def add_precision():
+    # Restore the add precision after a test changes it.
+    old = set_polarcomplex_add_precision('full')
+    yield
+    set_polarcomplex_add_precision(old)
+
+
+@pytest.mark.parametrize('typ', [polarcomplex64, polarcomplex128])
+@pytest.mark.parametrize('ufunc', [np.add, np.subtract])
+def test_add_subtract_result_type(typ, ufunc):
+    p1 = z1.astype(typ)
+    p2 = z2.astype(typ)
+    p = ufunc(p1, p2)
+    assert p.dtype == typ
+    # The magnitude of a sum is nonnegative, and the angle is in [-pi, pi].
+    r = np.array([w.r for w in p])
+    theta = np.array([w.theta for w in p])
+    assert np.all(r >= 0)
+    assert np.all(np.abs(theta) <= np.pi)
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+@pytest.mark.parametrize('ufunc', [np.add, np.subtract])
+def test_add_subtract_fast(typ, rtol, ufunc, add_precision):
+    rng = np.random.default_rng(8831209984512)
+    x = (rng.normal(size=500) + 1j*rng.normal(size=500)).astype(typ)
+    y = (rng.normal(size=500) + 1j*rng.normal(size=500)).astype(typ)
+    full = ufunc(x, y)
+    assert set_polarcomplex_add_precision('fast') == 'full'
+    assert get_polarcomplex_add_precision() == 'fast'
+    fast = ufunc(x, y)
+    assert fast.dtype == typ
+    assert_allclose([w.r for w in fast], [w.r for w in full], rtol=rtol)
+    assert_allclose([w.theta for w in fast], [w.theta for w in full],
+                    rtol=0, atol=max(3e-8, 20*rtol))
+
+
+def test_set_add_precision_bad_value(add_precision):
+    with pytest.raises(ValueError,
+                       match="precision must be one of 'full', 'fast'"):
+        set_polarcomplex_add_precision('medium')
+    assert get_polarcomplex_add_precision() == 'full'
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+def test_multiply_is_field_operation(typ, rtol):
+    p1 = np.array([typ((2, 1.5)), typ((-3, 0.25))])
+    p2 = np.array([typ((0.5, 4.0)), typ((2, -1.0))])
+    p = p1 * p2
+    assert_equal([w.r for w in p], [1.0, -6.0])
+    assert_equal([w.theta for w in p], [5.5, -0.75])
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+def test_power_real_exponent(typ, rtol):
+    p = np.power(z1.astype(typ), 2.5)
+    assert p.dtype == typ
+    assert_allclose(p.astype(np.complex128), z1**2.5, rtol=rtol)
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+def test_absolute_and_angle(typ, rtol):
+    p = z1.astype(typ)
+    a = np.absolute(p)
+    assert a.dtype == real_type[typ]
+    assert_allclose(a, np.absolute(z1), rtol=rtol)
+    # A negative magnitude and an angle outside [-pi, pi] are normalized.
+    q = np.array([typ((-2, 0.5)), typ((1, 7.0))])
+    assert_allclose(polar_angle(q), [0.5 - np.pi, 7.0 - 2*np.pi], rtol=rtol)
+    assert_allclose(polar_angle(p), np.angle(z1), rtol=rtol)
+
+
+@pytest.mark.parametrize('typ', [polarcomplex64, polarcomplex128])
+def test_comparison_ufuncs(typ):
+    p = np.array([typ((2, 0.5)), typ((-2, 0.5)), typ((1, 0.0))])
+    q = np.array([typ((2, 0.5)), typ((2, 0.5)), typ((1, 0.0))])
+    assert_equal(p == q, [True, False, True])
+    assert_equal(p != q, [False, True, False])
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+def test_add_reduce(typ, rtol):
+    rng = np.random.default_rng(40198312311)
+    z = rng.normal(size=5000) + 1j*rng.normal(size=5000)
+    p = z.astype(typ)
+    expected = p.astype(np.complex128).sum()
+    s = np.add.reduce(p)
+    assert isinstance(s, typ)
+    assert s.r >= 0
+    assert_allclose(complex(s), expected, rtol=10*rtol)
+    assert_allclose(p.reshape(50, 100).sum(axis=1).astype(np.complex128),
+                    p.astype(np.complex128).reshape(50, 100).sum(axis=1),
+                    rtol=10*rtol)
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+def test_multiply_reduce(typ, rtol):
+    p = np.array([typ((0.5, 1.0)), typ((-2.0, 0.25)), typ((1e-3, -3.0)),
+                  typ((4.0, 2.5))])
+    w = np.multiply.reduce(p)
+    assert isinstance(w, typ)
+    # The product is computed directly on the magnitudes and angles.
+    assert_allclose(w.r, -4e-3, rtol=rtol)
+    assert_allclose(w.theta, 0.75, rtol=rtol)
+
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+@pytest.mark.parametrize('ufunc, func', [(np.add, np.cumsum),
+                                         (np.multiply, np.cumprod)])
+def test_accumulate(typ, rtol, ufunc, func):
+    p = z1.astype(typ)
+    a = ufunc.accumulate(p)
+    assert a.dtype == typ
+    assert_allclose(a.astype(np.complex128), func(p.astype(np.complex128)),
+                    rtol=rtol)
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# Tests of casting
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+@pytest.mark.parametrize('typ, rtol', typ_rtol)
+@pytest.mark.parametrize('ctyp', [np.complex64, np.complex128,
+                                  np.clongdouble])
+def test_cast_complex_roundtrip(typ, rtol, ctyp):
+    z = np.concatenate((z1, [-3.0, 0.0])).astype(ctyp)
+    p = z.astype(typ)
+    assert p.dtype == typ
+    w = p.astype(ctyp)
+    assert w.dtype == ctyp
+    rtol = max(rtol, 10*np.finfo(ctyp).eps)
+    assert_allclose(w.astype(np.complex128), z.astype(np.complex128),
+                    rtol=rtol, atol=rtol)
+
+
+@pytest.mark.parametrize('typ', [polarcomplex64, polarcomplex128])
+def test_cast_real_value_keeps_sign(typ):
+    p = np.array([-3.0 + 0j, 2.0 + 0j]).astype(typ)
+    assert_equal([w.r for w in p], [-3.0, 2.0])
+    assert_equal([w.theta for w in p], [0.0, 0.0])
+
+
+@pytest.mark.parametrize('typ', [polarcomplex64, polarcomplex128])
+@pytest.mark.parametrize('ftyp', [np.float32, np.float64])
+def test_cast_to_real_is_magnitude(typ, ftyp):
+    p = np.array([typ((2.5, 1.0)), typ((-4.0, 0.5)), typ((0.0, 3.0))])
+    m = p.astype(ftyp)
+    assert m.dtype == ftyp
+    assert_equal(m, [2.5, 4.0, 0.0])
+
+
+def test_cast_between_polarcomplex_types():
+    p64 = np.array([polarcomplex64((2.5, 1.25)),
+                    polarcomplex64((-4.0, 0.5))])
+    p128 = p64.astype(polarcomplex128)
+    assert p128.dtype == polarcomplex128
+    assert_equal([w.r for w in p128], [2.5, -4.0])
+    assert_equal([w.theta for w in p128], [1.25, 0.5])
+    assert_equal(p128.astype(polarcomplex64), p64)
+    assert np.can_cast(polarcomplex64, polarcomplex128)
+    assert not np.can_cast(polarcomplex128, polarcomplex64)
+    assert (p64 * p128).dtype == polarcomplex128
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# Tests of polar_fields, from_arrays and item assignment
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+@pytest.mark.parametrize('typ', [polarcomplex64, polarcomplex128])
+def test_polar_fields(typ):
+    p = np.array([typ((1.0, 0.5)), typ((2.0, -1.5)), typ((-3.0, 2.0)),
+                  typ((4.0, 0.0))]).reshape(2, 2)[:, ::-1]
+    r, theta = polar_fields(p)
+    assert r.dtype == real_type[typ]
+    assert theta.dtype == real_type[typ]
+    assert_equal(r, [[2.0, 1.0], [4.0, -3.0]])
+    assert_equal(theta, [[-1.5, 0.5], [0.0, 2.0]])
+    assert np.shares_memory(r, p)
+    r[0, 0] = 10.0
+    theta[1, 1] = 0.25
+    assert p[0, 0].r == 10.0
+    assert p[1, 1].theta == 0.25
+
+
+def test_polar_fields_bad_dtype():
+    with pytest.raises(TypeError, match='expected an array with dtype'):
+        polar_fields(np.zeros(3))
+
+
+@pytest.mark.parametrize('typ', [polarcomplex64, polarcomplex128])
+def test_from_arrays(typ):
+    r = np.array([[1.0], [2.0]])
+    theta = np.array([0.5, -0.25, 1.0])
+    p = typ.from_arrays(r, theta)
+    assert p.dtype == typ
+    assert p.shape == (2, 3)
+    pr, ptheta = polar_fields(p)
+    assert_equal(pr, np.broadcast_to(r, (2, 3)))
+    assert_equal(ptheta, np.broadcast_to(theta, (2, 3)))
+
+
+def test_from_arrays_out():
+    out = np.zeros(4, dtype=polarcomplex128)
+    p = polarcomplex128.from_arrays(np.arange(4.0), 0.5, out=out)
+    assert p is out
+    assert_equal(polar_fields(out)[0], np.arange(4.0))
+    assert_equal(polar_fields(out)[1], np.full(4, 0.5))
+    with pytest.raises(TypeError, match='out must be an array'):
+        polarcomplex64.from_arrays(1.0, 0.5, out=out)
+
+
+@pytest.mark.parametrize('typ', [polarcomplex64, polarcomplex128])
+def test_setitem(typ):
+    p = np.zeros(4, dtype=typ)
+    p[0] = 3 + 4j
+    p[1] = (2.0, 0.5)
+    p[2] = polarcomplex128((-1.5, 0.25))
+    p[3] = -2.0
+    assert_equal([w.r for w in p], [5.0, 2.0, -1.5, -2.0])
+    assert_allclose([w.theta for w in p], [math.atan2(4, 3), 0.5, 0.25, 0.0],
+                    rtol=1e-7)
+    with pytest.raises(ValueError, match='must have length 2'):
+        p[0] = (1.0, 2.0, 3.0)
+    with pytest.raises(TypeError, match='must be a tuple of two floats'):
+        p[0] = object()
+    with pytest.raises(ValueError, match='could not convert string'):
+        p[0] = 'abc'
+
+
+@pytest.mark.parametrize('typ', [polarcomplex64, polarcomplex128])
+def test_fromstring(typ):
+    a = np.fromstring('3+4j 1.5 -2j j (1-j) nan', dtype=typ, sep=' ')
+    expected = [3+4j, 1.5, -2j, 1j, 1-1j]
+    assert_allclose(a[:5].astype(np.complex128), expected, rtol=1e-6)
+    assert np.isnan(a[5].r)
+
+
+@pytest.mark.parametrize('typ', [polarcomplex64, polarcomplex128])
+def test_loadtxt(typ):
+    a = np.loadtxt(io.StringIO('1+2j, -3\n(0.5-0.5j), 2j\n'), dtype=typ,
+                   delimiter=',')
+    assert_allclose(a.astype(np.complex128), [[1+2j, -3], [0.5-0.5j, 2j]],
+                    rtol=1e-6)
+
+
+def test_str_init():
+    z = polarcomplex128(' 3-4j ')
+    assert z.r == 5.0
+    assert_allclose(z.theta, math.atan2(-4, 3), rtol=1e-15)
+    with pytest.raises(ValueError, match='could not convert string'):
+        polarcomplex128('3-4')
@@ -0,0 +1,120 @@
+import pytest
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal
+from numtypes import logfloat16, logfloat32, logfloat64, random
+
+
+def frequencies(samples, n):
+    return np.bincount(samples.ravel(), minlength=n) / samples.size
+
+
+# The logs of the weights are shifted far below the range of float64,
+# except for logfloat16, whose logs have only 11 bits.
+@pytest.mark.parametrize('typ, shift', [(logfloat16, 0.0),
+                                        (logfloat32, -1500.0),
+                                        (logfloat64, -1500.0),
+                                        (None, -1500.0)])
+def test_distribution(typ, shift):
+    p = np.array([0.1, 0.0, 0.2, 0.3, 0.4, 0.0])
+    if typ is None:
+        with np.errstate(divide='ignore'):
+            w = np.log(p) + shift
+    else:
+        w = p.astype(typ) * typ(logfloat64(log=shift))
+    samples = random.categorical(w, size=200000, rng=12345)
+    assert samples.dtype == np.intp
+    assert samples.shape == (200000,)
+    assert_allclose(frequencies(samples, 6), p, atol=5e-3)
+
+
+def test_float_logs_not_converted():
+    # A float array holds the logs of the weights.
+    samples = random.categorical([0.0, 0.0, np.log(2.0)], size=100000,
+                                 rng=1)
+    assert_allclose(frequencies(samples, 3), [0.25, 0.25, 0.5], atol=5e-3)
+
+
+def test_zero_weights_at_ends():
+    w = np.array([0.0, 0.0, 1.0, 0.0, 2.0, 0.0, 0.0]).astype(logfloat64)
+    samples = random.categorical(w, size=10000, rng=2)
+    assert set(np.unique(samples)) == {2, 4}
+
+
+@pytest.mark.parametrize('typ', [logfloat16, logfloat32, logfloat64])
+def test_byte_order_and_alignment(typ):
+    w = np.array([0.0, 1.0, 0.0, 3.0, 0.0]).astype(typ)
+    expected = random.categorical(w, size=1000, rng=5)
+    swapped = w.astype(w.dtype.newbyteorder('S'))
+    assert_equal(random.categorical(swapped, size=1000, rng=5), expected)
+    # An unaligned copy of w.
+    buf = np.zeros(w.nbytes + 1, dtype=np.uint8)
+    unaligned = buf[1:].view(typ)
+    unaligned[...] = w
+    assert_equal(random.categorical(unaligned, size=1000, rng=5), expected)
+
+
+def test_shuffled():
+    w = np.ones(4).astype(logfloat64)
+    samples = random.categorical(w, size=1000, rng=3)
+    assert not (np.diff(samples) >= 0).all()
+    # All the orders of a pair are equally likely.
+    pairs = random.categorical(w, size=(20000, 2), rng=4)
+    lower = (pairs[:, 0] < pairs[:, 1]).mean()
+    upper = (pairs[:, 0] > pairs[:, 1]).mean()
+    assert_allclose(lower, upper, atol=0.02)
+
+
+def test_batch_and_axis():
+    # In each distribution, one category has weight 1 and the others 0.
+    w = np.zeros((5, 3, 4))
+    for i, j in np.ndindex(3, 4):
+        w[(i + j) % 5, i, j] = 1
+    w = w.astype(logfloat32)
+    samples = random.categorical(w, size=(2, 3), rng=5, axis=0)
+    assert samples.shape == (3, 4, 2, 3)
+    for i, j in np.ndindex(3, 4):
+        assert_equal(samples[i, j], (i + j) % 5)
+    w0 = np.moveaxis(w, 0, -1)
+    # Non-contiguous weights give the same result as contiguous ones.
+    w1 = np.ascontiguousarray(w0)
+    assert_equal(random.categorical(w0[:2, 1:], size=7, rng=6),
+                 random.categorical(w1[:2, 1:], size=7, rng=6))
+
+
+def test_size():
+    w = np.array([1.0, 2.0]).astype(logfloat64)
+    x = random.categorical(w, rng=7)
+    assert isinstance(x, np.intp)
+    assert random.categorical(w, size=3, rng=7).shape == (3,)
+    assert random.categorical(w, size=0, rng=7).shape == (0,)
+    assert random.categorical(np.ones((0, 2)), size=3, rng=7).shape == (0, 3)
+    assert random.categorical(np.ones((3, 2)), rng=7).shape == (3,)
+
+
+def test_rng():
+    w = np.ones(10).astype(logfloat64)
+    rng = np.random.default_rng(8)
+    a = random.categorical(w, size=20, rng=rng)
+    b = random.categorical(w, size=20, rng=rng)
+    assert not np.array_equal(a, b)
+    assert_equal(random.categorical(w, size=20, rng=8), a)
+    assert_equal(random.categorical(w, size=20,
+                                    rng=np.random.PCG64(8)), a)
+
+
+@pytest.mark.parametrize('w', [[np.nan, 0.0], [np.inf, 0.0],
+                               [-np.inf, -np.inf], []])
+def test_bad_weights(w):
+    with pytest.raises(ValueError):
+        random.categorical(np.array(w), size=3, rng=9)
+
+
+def test_bad_arguments():
+    with pytest.raises(ValueError, match='at least one dimension'):
+        random.categorical(np.float64(0.0), rng=10)
+    with pytest.raises(TypeError):
+        random.categorical(np.array([1j, 2j]), rng=10)
+    with pytest.raises(ValueError, match='size'):
+        random.categorical([0.0, 0.0], size=-1, rng=10)
+    with pytest.raises(np.AxisError):
+        random.categorical([0.0, 0.0], axis=1, rng=10)
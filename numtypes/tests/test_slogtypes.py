@@ -0,0 +1,250 @@
+
+import math
+import pytest
+import numpy as np
+from numpy.testing import assert_equal, assert_allclose
+from numtypes import (slogfloat32, slogfloat64, logfloat, logfloat32,
+                      logfloat64)
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+@pytest.mark.parametrize('value', [-3.5, -1.0, 0.0, 0.25, 8.0])
+def test_value(typ, value):
+    x = typ(value)
+    assert_allclose(float(x), value, rtol=1e-6)
+    assert x.sign == (-1 if value < 0 else 1)
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+def test_log_keyword(typ):
+    x = typ(log=-1000.0, sign=-1)
+    assert x.log == -1000.0
+    assert x.sign == -1
+    assert x < 0
+    assert str(x) == f'{typ.__name__}(log=-1000.0, sign=-1)'
+    assert str(typ(log=2.5)) == f'{typ.__name__}(log=2.5)'
+
+
+def test_bad_args():
+    with pytest.raises(ValueError, match='sign must be'):
+        slogfloat64(log=1.0, sign=0)
+    with pytest.raises(TypeError, match='but not both'):
+        slogfloat64(2.0, log=1.0)
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+def test_scalar_arithmetic(typ):
+    x = typ(3.0)
+    y = typ(-5.0)
+    assert_allclose(float(x + y), -2.0, rtol=1e-6)
+    assert_allclose(float(x - y), 8.0, rtol=1e-6)
+    assert_allclose(float(y - x), -8.0, rtol=1e-6)
+    assert_allclose(float(x * y), -15.0, rtol=1e-6)
+    assert_allclose(float(y / x), -5/3, rtol=1e-6)
+    assert_allclose(float(-x), -3.0, rtol=1e-6)
+    assert_allclose(float(abs(y)), 5.0, rtol=1e-6)
+    assert float(x - x) == 0.0
+    assert not bool(x - x)
+
+
+def test_scalar_result_type():
+    assert type(slogfloat32(1.0) + slogfloat32(2.0)) is slogfloat32
+    assert type(slogfloat32(1.0) + 2.0) is slogfloat32
+    assert type(slogfloat32(1.0) + slogfloat64(2.0)) is slogfloat64
+    assert type(slogfloat32(1.0) - logfloat64(2.0)) is slogfloat64
+
+
+def test_extreme_cancellation():
+    # exp(-1000) - exp(-1000.5), far below the smallest double.
+    x = slogfloat64(log=-1000.0)
+    y = slogfloat64(log=-1000.5)
+    z = y - x
+    assert z.sign == -1
+    assert math.isclose(z.log, -1000.0 + math.log1p(-math.exp(-0.5)),
+                        rel_tol=1e-15)
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+def test_comparisons(typ):
+    values = [-np.inf, -7.0, -0.5, 0.0, 0.5, 7.0, np.inf]
+    a = np.array(values, dtype=typ)
+    for i, x in enumerate(values):
+        for j, y in enumerate(values):
+            assert_equal((a[i] < a[j], a[i] <= a[j], a[i] == a[j]),
+                         (x < y, x <= y, x == y))
+    assert_equal(np.less(a, a[::-1]), np.less(values, values[::-1]))
+    assert_equal(np.greater_equal(a, a[::-1]),
+                 np.greater_equal(values, values[::-1]))
+    assert typ(0.0) == -typ(0.0)
+
+
+def test_comparisons_nan():
+    a = np.array([np.nan, 1.0], dtype=slogfloat64)
+    b = np.array([1.0, np.nan], dtype=slogfloat64)
+    assert_equal(a == b, [False, False])
+    assert_equal(a != b, [True, True])
+    assert_equal(a < b, [False, False])
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+@pytest.mark.parametrize('ufunc', [np.add, np.subtract, np.multiply,
+                                   np.true_divide, np.minimum, np.maximum])
+def test_binary_ufuncs(typ, ufunc):
+    x = np.array([1.5, -2.0, 3.0, -0.25, 0.0, 4.0])
+    y = np.array([-0.5, -3.0, 3.0, 8.0, -2.0, 4.0])
+    z = ufunc(x.astype(typ), y.astype(typ))
+    assert z.dtype == typ
+    assert_allclose(z.astype(np.float64), ufunc(x, y), rtol=1e-6, atol=1e-6)
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+@pytest.mark.parametrize('ufunc', [np.negative, np.positive, np.absolute,
+                                   np.reciprocal, np.square, np.sign])
+def test_unary_ufuncs(typ, ufunc):
+    x = np.array([1.5, -2.0, 3.0, -0.25, 4.0])
+    z = ufunc(x.astype(typ))
+    assert z.dtype == typ
+    assert_allclose(z.astype(np.float64), ufunc(x), rtol=1e-6)
+
+
+def test_logical_ufuncs():
+    x = np.array([1.0, -np.inf, np.nan, -2.0, 0.0])
+    a = x.astype(slogfloat64)
+    assert_equal(np.isnan(a), np.isnan(x))
+    assert_equal(np.isinf(a), np.isinf(x))
+    assert_equal(np.isfinite(a), np.isfinite(x))
+    assert_equal(np.signbit(a), [False, True, False, True, False])
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+def test_reductions(typ):
+    x = np.array([2.0, -3.0, 0.5, -4.0, 1.25])
+    a = x.astype(typ)
+    assert_allclose(float(np.add.reduce(a)), x.sum(), rtol=1e-6)
+    assert_allclose(float(np.multiply.reduce(a)), x.prod(), rtol=1e-6)
+    assert_allclose(np.cumsum(a).astype(np.float64), np.cumsum(x), rtol=1e-6)
+    assert_allclose(float(a.max()), 2.0)
+    assert_allclose(float(a.min()), -4.0)
+    assert a.argmin() == 3
+    assert a.argmax() == 0
+
+
+def test_alternating_series():
+    # sum_k (-1)**k * exp(-2000*k) with terms far below the double range.
+    k = np.arange(20)
+    terms = np.array([slogfloat64(log=-2000.0*j, sign=(-1)**j) for j in k])
+    terms = terms.astype(slogfloat64)
+    s = np.add.reduce(terms)
+    assert s.sign == 1
+    assert math.isclose(s.log, -math.log1p(math.exp(-2000.0)), abs_tol=1e-15)
+    s = np.add.reduce(terms[1:])
+    assert s.sign == -1
+    assert math.isclose(s.log, -2000.0, rel_tol=1e-15)
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+@pytest.mark.parametrize('ltyp', [logfloat32, logfloat64])
+def test_logfloat_casts(typ, ltyp):
+    logs = np.array([-1000.0, -2.5, 0.0, 3.0, -np.inf])
+    a = np.array([ltyp(log=t) for t in logs], dtype=ltyp)
+    s = a.astype(typ)
+    assert s.dtype == typ
+    assert_equal([z.sign for z in s], [1]*5)
+    assert_equal([float(z.log) for z in s], logs)
+    s[1] = -s[1]
+    back = s.astype(ltyp)
+    assert_equal(np.isnan(back.astype(np.float64)),
+                 [False, True, False, False, False])
+    assert back[0].log == np.array(-1000.0, dtype=ltyp().log.dtype)
+
+
+def test_promotion():
+    x = np.array([1.0, -2.0], dtype=slogfloat64)
+    lf = np.array([3.0, 4.0], dtype=logfloat32)
+    z = x + lf
+    assert z.dtype == slogfloat64
+    assert_allclose(z.astype(np.float64), [4.0, 2.0])
+    x = x.astype(slogfloat32)
+    z = x + np.array([-1.0, 5.0], dtype=np.int32)
+    assert z.dtype == slogfloat32
+    assert_allclose(z.astype(np.float64), [0.0, 3.0], atol=1e-6)
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+@pytest.mark.parametrize('ltyp', [logfloat32, logfloat64])
+def test_logfloat_cast_safety(typ, ltyp):
+    # The casts to the logfloat types lose the sign, so they are not safe.
+    assert not np.can_cast(typ, ltyp)
+    if np.dtype(ltyp).itemsize <= np.dtype(typ).itemsize//2:
+        assert np.can_cast(ltyp, typ)
+        assert np.result_type(typ, ltyp) == typ
+        assert np.result_type(ltyp, typ) == typ
+    else:
+        # logfloat64 and slogfloat32: neither is cast safely to the other.
+        assert not np.can_cast(ltyp, typ)
+        with pytest.raises(TypeError):
+            np.result_type(typ, ltyp)
+
+
+def test_logfloat_promotion_keeps_the_sign():
+    s = np.array([-5.0, 2.0]).astype(slogfloat32)
+    c = np.concatenate([s, np.array([1.0]).astype(logfloat32)])
+    assert c.dtype == slogfloat32
+    assert_allclose(c.astype(np.float64), [-5.0, 2.0, 1.0], rtol=1e-6)
+    # There is no common dtype of slogfloat32 and logfloat64, so they must
+    # be cast explicitly.
+    lf = np.array([1.0]).astype(logfloat64)
+    with pytest.raises(TypeError):
+        np.concatenate([s, lf])
+    with pytest.raises(TypeError):
+        s + lf
+    z = s.astype(slogfloat64) + lf
+    assert z.dtype == slogfloat64
+    assert_allclose(z.astype(np.float64), [-4.0, 3.0], rtol=1e-6)
+
+
+@pytest.mark.parametrize('typ', [np.int8, np.int64, np.uint16, np.float32,
+                                 np.float64])
+def test_builtin_casts(typ):
+    # As with logfloat64, the value is exp(log), so only 0 and 1 are
+    # certain to survive a round trip through an integer type.
+    x = np.array([0, 1, 1, 0], dtype=typ)
+    if np.issubdtype(typ, np.signedinteger) or np.issubdtype(typ, np.floating):
+        x[1] = -x[1]
+    a = x.astype(slogfloat64)
+    assert_equal([z.sign for z in a], np.where(np.signbit(x), -1, 1))
+    assert_equal(a.astype(typ), x)
+    assert_equal(a.astype(bool), x.astype(bool))
+    y = np.array([-7, 100, 0], dtype=np.int64).astype(typ)
+    assert_allclose(y.astype(slogfloat64).astype(np.complex128),
+                    y.astype(np.complex128), rtol=1e-14)
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+def test_from_python_logfloat(typ):
+    # The logs are copied, so values outside the range of float64 are
+    # not lost.
+    values = [logfloat(log=-1000), logfloat(log=2000.5), logfloat(0)]
+    expected = [-1000.0, 2000.5, -math.inf]
+    a = np.array(values, dtype=typ)
+    assert a.dtype == typ
+    assert_equal([z.log for z in a], expected)
+    assert_equal([z.sign for z in a], [1, 1, 1])
+    a[1] = values[0]
+    assert a[1].log == -1000.0
+    assert typ(values[0]).log == -1000.0
+    assert typ(values[0], sign=-1).sign == -1
+    assert (typ(values[0]) * values[1]).log == 1000.5
+
+
+@pytest.mark.parametrize('typ', [slogfloat32, slogfloat64])
+def test_to_python_logfloat(typ):
+    a = np.array([typ(log=-1000), typ(log=2000.5), typ(0),
+                  typ(log=-1000, sign=-1)])
+    values = [logfloat(z) for z in a.tolist()]
+    assert all(type(z) is logfloat for z in values)
+    assert_equal([z.log for z in values[:3]], [-1000.0, 2000.5, -math.inf])
+    # As in the casts to the logfloat dtypes, a negative value gives nan.
+    assert math.isnan(values[3].log)
+    assert values[0] == a[0]
+    assert (values[0] * a[0]).log == -2000.0
@@ -0,0 +1,227 @@
+import threading
+import pytest
+import numpy as np
+from numpy.testing import assert_equal, assert_allclose
+from numtypes import nint32, logfloat16, logfloat32, logfloat64
+from numtypes import stream
+
+
+def raw(a):
+    # The bytes of the array, for exact comparison (nan == nan, etc).
+    return np.ascontiguousarray(a).view(np.uint8)
+
+
+def memmap(tmp_path, arr):
+    # A read-only memory map of a file that holds arr.
+    path = tmp_path / 'data.bin'
+    m = np.memmap(path, dtype=arr.dtype, mode='w+', shape=arr.shape)
+    m[...] = arr
+    m.flush()
+    del m
+    return np.memmap(path, dtype=arr.dtype, mode='r', shape=arr.shape)
+
+
+def logfloat_data(typ, shape, seed=0):
+    rng = np.random.default_rng(seed)
+    ftype = {logfloat16: np.float16, logfloat32: np.float32,
+             logfloat64: np.float64}[typ]
+    return rng.normal(scale=3, size=shape).astype(ftype).view(typ)
+
+
+@pytest.mark.parametrize('typ', [logfloat32, logfloat64])
+@pytest.mark.parametrize('readahead', [False, True])
+def test_logfloat_sum_exact(tmp_path, typ, readahead):
+    a = logfloat_data(typ, 100003)
+    m = memmap(tmp_path, a)
+    s = stream.sum(m, max_bytes=4096, readahead=readahead)
+    assert s.dtype == typ
+    assert raw(s).tobytes() == raw(np.add.reduce(a)).tobytes()
+
+
+@pytest.mark.parametrize('readahead', [False, True])
+def test_logfloat16_sum(tmp_path, readahead):
+    # The running sum is rounded to half precision between chunks.
+    a = logfloat_data(logfloat16, 100003)
+    m = memmap(tmp_path, a)
+    s = stream.sum(m, max_bytes=4096, readahead=readahead)
+    assert s.dtype == logfloat16
+    assert_allclose(s.log, np.add.reduce(a).log, rtol=2e-3)
+
+
+def test_sum_2d_exact(tmp_path):
+    a = logfloat_data(logfloat32, (5001, 7))
+    s = stream.sum(memmap(tmp_path, a), max_bytes=1000)
+    assert s.shape == (7,)
+    assert_equal(raw(s), raw(np.add.reduce(a, axis=0)))
+
+
+def test_nint32_sum_exact():
+    a = np.arange(-20000, 30000).astype(nint32)
+    assert stream.sum(a, max_bytes=1024) == np.add.reduce(a)
+    a[1234] = np.nan
+    s = stream.sum(a, max_bytes=1024)
+    assert np.isnan(s)
+
+
+def test_nint32_sum_overflow():
+    a = np.full(1000, 2**24, dtype=nint32)
+    with pytest.raises(Exception) as exc_info:
+        np.add.reduce(a)
+    with pytest.raises(type(exc_info.value), match='overflow'):
+        stream.sum(a, max_bytes=100)
+
+
+@pytest.mark.parametrize('data', [
+    np.arange(10000).astype(nint32)[::-1],
+    logfloat_data(logfloat64, 10000),
+    np.random.default_rng(1).normal(size=(3000, 3)),
+])
+def test_max_min(data):
+    assert_equal(raw(stream.max(data, max_bytes=512)),
+                 raw(np.maximum.reduce(data, axis=0)))
+    assert_equal(raw(stream.min(data, max_bytes=512)),
+                 raw(np.minimum.reduce(data, axis=0)))
+
+
+def test_float_sum():
+    # Float sums are pairwise within a chunk, so they can differ in the
+    # last bits.
+    a = np.random.default_rng(2).normal(size=100000)
+    assert_allclose(stream.sum(a, max_bytes=10000), a.sum(), rtol=1e-12)
+
+
+def test_nanmean_nint32():
+    a = np.arange(-5000, 7000).astype(nint32)
+    a[::7] = np.nan
+    values = a.view(np.int32)[~np.isnan(a)].astype(np.int64)
+    m = stream.nanmean(a, max_bytes=1000)
+    assert m.dtype == np.float64
+    assert m == values.sum() / len(values)
+
+
+def test_nanmean_2d():
+    a = np.random.default_rng(3).normal(size=(2000, 3))
+    a[::3, 0] = np.nan
+    a[:, 2] = np.nan
+    m = stream.nanmean(a, max_bytes=1000)
+    assert_allclose(m[:2], np.nanmean(a[:, :2], axis=0), rtol=1e-12)
+    assert np.isnan(m[2])
+
+
+def test_nanmean_logfloat():
+    a = logfloat_data(logfloat64, 10000)
+    a[::5] = np.nan
+    m = stream.nanmean(a, max_bytes=4000)
+    assert m.dtype == logfloat64
+    good = a[~np.isnan(a)]
+    assert_allclose(m.log, (np.add.reduce(good) / len(good)).log,
+                    rtol=1e-12)
+
+
+@pytest.mark.parametrize('ftype', [np.float32, np.float64])
+def test_logsumexp(tmp_path, ftype):
+    x = (np.random.default_rng(4).normal(size=50000) - 800).astype(ftype)
+    r = stream.logsumexp(memmap(tmp_path, x), max_bytes=3000)
+    assert r.dtype == ftype
+    typ = {np.float32: logfloat32, np.float64: logfloat64}[ftype]
+    assert r == np.asarray(np.add.reduce(x.view(typ))).view(ftype)
+    if ftype == np.float64:
+        assert_allclose(r, np.logaddexp.reduce(x), rtol=1e-12)
+
+
+def test_func():
+    x = np.random.default_rng(5).normal(size=20000).astype(np.float32)
+
+    def f(chunk):
+        # A chain of ufuncs: the logs of the values of 0.5*x**2.
+        return np.multiply(np.square(chunk), 0.5).view(logfloat32)
+
+    s = stream.sum(x, func=f, max_bytes=2048)
+    assert s == np.add.reduce(f(x))
+    assert stream.logsumexp(x, func=f, max_bytes=2048) == np.float32(s.log)
+
+
+def test_buffers():
+    a = logfloat_data(logfloat32, 10000)
+    data = a.tobytes()
+    # Buffers whose sizes are not multiples of the itemsize.
+    pieces = [data[k:k + 1001] for k in range(0, len(data), 1001)]
+    s = stream.sum(iter(pieces), dtype=logfloat32, max_bytes=3000)
+    assert s == np.add.reduce(a)
+    with pytest.raises(ValueError, match='multiple of the itemsize'):
+        stream.sum(pieces + [b'x'], dtype=logfloat32)
+    with pytest.raises(TypeError, match='dtype'):
+        stream.sum(pieces)
+
+
+def test_arrays():
+    a = np.arange(-500, 700).astype(nint32)
+    pieces = [a[:10], a[10:10], a[10:900], a[900:]]
+    assert stream.sum(pieces, max_bytes=100) == np.add.reduce(a)
+    assert_equal(np.concatenate(list(stream.chunks(pieces, max_bytes=100))),
+                 a)
+
+
+def test_empty():
+    e = np.zeros(0, dtype=logfloat64)
+    assert stream.sum(e) == np.add.reduce(e)
+    assert stream.sum([], dtype=logfloat64) == np.add.reduce(e)
+    with pytest.raises(ValueError):
+        stream.max(np.zeros(0, dtype=nint32))
+    with pytest.raises(ValueError, match='dtype'):
+        stream.sum([])
+
+
+def test_apply(tmp_path):
+    x = logfloat_data(logfloat32, (3000, 4))
+    src = memmap(tmp_path, x)
+    out = np.memmap(tmp_path / 'out.bin', dtype=logfloat32, mode='w+',
+                    shape=x.shape)
+    result = stream.apply(lambda c: np.multiply(c, c, out=c), src, out,
+                          max_bytes=1000)
+    assert result is out
+    assert_equal(raw(out), raw(x * x))
+    with pytest.raises(ValueError, match='longer'):
+        stream.apply(lambda c: c, src, np.empty((10, 4), logfloat32))
+    with pytest.raises(ValueError, match='rows'):
+        stream.apply(lambda c: c, src, np.empty((5000, 4), logfloat32))
+
+
+def test_chunk_sizes():
+    a = np.zeros((2**16, 16))
+    sizes = [c.nbytes for c in stream.chunks(a, max_bytes=2**20 // 4)]
+    assert np.sum(sizes) == a.nbytes
+    assert np.max(sizes) <= 2**20 // 4
+    # A fast consumer gets chunks of the maximum size.
+    assert sizes[-2] == 2**20 // 4
+    # At least one row per chunk.
+    assert [len(c) for c in stream.chunks(a, max_bytes=10)][:3] == [1, 1, 1]
+    with pytest.raises(ValueError, match='max_bytes'):
+        list(stream.chunks(a, max_bytes=0))
+
+
+def test_chunk_size_adapts():
+    size = stream._ChunkSize(2**24)
+    n = size.nbytes
+    size.update(n, 0.001)
+    assert size.nbytes == 2*n
+    size.update(2*n, 10.0)
+    assert size.nbytes == n
+    # A short chunk doesn't make the chunks grow.
+    size.update(10, 0.001)
+    assert size.nbytes == n
+
+
+def test_readahead_errors_and_cleanup():
+    def source():
+        yield np.arange(10.0)
+        raise RuntimeError('read error')
+
+    before = threading.active_count()
+    with pytest.raises(RuntimeError, match='read error'):
+        stream.sum(source())
+    # Stopping early stops the reader thread.
+    for chunk in stream.chunks(np.zeros(10**6), max_bytes=1000):
+        break
+    del chunk
+    assert threading.active_count() == before
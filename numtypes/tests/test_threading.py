@@ -0,0 +1,115 @@
+
+# These tests use the types from several threads at once.  With the GIL,
+# they check that nothing depends on the order in which the threads run;
+# in the free-threaded build of CPython, the threads really run in
+# parallel.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import numpy as np
+from numpy.testing import assert_equal
+from numtypes import (nint32, get_nint32_cast_policy, set_nint32_cast_policy,
+                      polarcomplex64, polarcomplex128,
+                      get_polarcomplex_add_precision,
+                      set_polarcomplex_add_precision,
+                      logpolarcomplex128, logfloat, logfloat32, logfloat64,
+                      slogfloat64)
+
+
+nthreads = 8
+
+
+def run_in_threads(func, n=nthreads):
+    # Start all the threads together, to give them the best chance to
+    # run at the same time.
+    barrier = threading.Barrier(n)
+
+    def target(k):
+        barrier.wait()
+        return func(k)
+
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        return list(executor.map(target, range(n)))
+
+
+@pytest.mark.parametrize('typ', [nint32, polarcomplex64, polarcomplex128,
+                                 logpolarcomplex128, logfloat32, logfloat64,
+                                 slogfloat64])
+def test_ufuncs_in_threads(typ):
+    x = np.linspace(1, 50, 1000).astype(typ)
+
+    def work():
+        return [str(z) for z in (x * x + x)[::97]] + [str(x.sum())]
+
+    expected = work()
+    results = run_in_threads(lambda k: work())
+    assert all(r == expected for r in results)
+
+
+def test_scalars_in_threads():
+    def work(k):
+        total = logfloat(0.0)
+        for i in range(1, 200):
+            total += logfloat(i) * logfloat(log=-k)
+        return (total, nint32(k) * nint32(3), polarcomplex128(1j) * k,
+                logfloat64(k + 1) / logfloat64(2.0))
+
+    assert run_in_threads(work) == [work(k) for k in range(nthreads)]
+
+
+def test_nint32_cast_policy_in_threads():
+    # Each cast reads the policy once, so every result is consistent with
+    # one of the two policies, while another thread switches between them.
+    a = np.array([1, 2**40, -2**40, 5] * 25, dtype=np.int64)
+    with_nan = a.astype(np.float64)
+    with_nan[np.abs(a) > 2**31] = np.nan
+    with_clip = np.clip(a, -2**31 + 1, 2**31 - 1)
+    old = get_nint32_cast_policy()
+    stop = threading.Event()
+
+    def switch():
+        while not stop.is_set():
+            set_nint32_cast_policy('nan')
+            set_nint32_cast_policy('clip')
+
+    def work(k):
+        results = set()
+        for _ in range(200):
+            b = a.astype(nint32).astype(np.float64)
+            if np.array_equal(b, with_nan, equal_nan=True):
+                results.add('nan')
+            else:
+                assert_equal(b, with_clip)
+                results.add('clip')
+        return results
+
+    set_nint32_cast_policy('clip')
+    switcher = threading.Thread(target=switch)
+    switcher.start()
+    try:
+        run_in_threads(work, n=4)
+    finally:
+        stop.set()
+        switcher.join()
+        set_nint32_cast_policy(old)
+    assert get_nint32_cast_policy() == old
+
+
+def test_set_polarcomplex_add_precision_in_threads():
+    # set_polarcomplex_add_precision returns the previous value, and the
+    # exchange is atomic, so the threads see a consistent sequence.
+    old = set_polarcomplex_add_precision('full')
+    try:
+        results = run_in_threads(
+            lambda k: [set_polarcomplex_add_precision(p)
+                       for p in ['fast', 'full'] * 100])
+        nfast = sum(r.count('fast') for r in results)
+        nfull = sum(r.count('full') for r in results)
+        # Every 'fast' that was set is returned exactly once, either to
+        # a thread or by the final call below.
+        final = get_polarcomplex_add_precision()
+        assert nfast + (final == 'fast') == nthreads*100
+        assert nfull + (final == 'full') == nthreads*100 + 1
+    finally:
+        set_polarcomplex_add_precision(old)
@@ -17,6 +17,9 @@
 
 #include <math.h>
 
+#include "numtypes_logfloat.h"
+#include "numtypes_module.h"
+
 //
 // C functions for adding and subtracting log-based `double` values.
 //
@@ -64,17 +67,67 @@ logsubexp(double log1, double log2)
 // Create the Python type logfloat
 // - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-typedef struct {
-    PyObject_HEAD
-    double log;  // The natural log of the value.
-} PyLogFloat;
+// The PyLogFloat struct is defined in numtypes_logfloat.h.
 
 // Forward declaration.
 static PyTypeObject PyLogFloat_Type;
 
 static inline int
 PyLogFloat_Check(PyObject* object) {
-    return PyObject_IsInstance(object, (PyObject*) &PyLogFloat_Type);
+    return PyObject_TypeCheck(object, &PyLogFloat_Type);
+}
+
+//
+// Other types whose instances hold a log (the NumPy scalar types
+// logfloat16, logfloat32, logfloat64, slogfloat32 and slogfloat64).  They
+// are registered by the _logtypes and _slogtypes modules when they are
+// imported, with register_log_type.
+//
+
+#define MAX_LOG_TYPES 8
+
+static struct {
+    PyTypeObject *type;
+    double (*get_log)(PyObject *);
+} log_types[MAX_LOG_TYPES];
+
+static int num_log_types = 0;
+
+// Registration happens in the exec functions of _logtypes and _slogtypes,
+// which are serialized by the import lock, and the registered types have no
+// instances before they return.
+static int
+register_log_type(PyTypeObject *type, double (*get_log)(PyObject *))
+{
+    if (num_log_types == MAX_LOG_TYPES) {
+        PyErr_SetString(PyExc_RuntimeError,
+                        "too many types registered with logfloat");
+        return -1;
+    }
+    log_types[num_log_types].type = type;
+    log_types[num_log_types].get_log = get_log;
+    ++num_log_types;
+    return 0;
+}
+
+//
+// If o is a logfloat or an instance of a registered type, store its log
+// in *log and return 1.  Otherwise return 0.
+//
+static inline int
+get_log_if_log_type(PyObject *o, double *log)
+{
+    if (PyLogFloat_Check(o)) {
+        *log = ((PyLogFloat *) o)->log;
+        return 1;
+    }
+    for (int k = 0; k < num_log_types; ++k) {
+        if (PyObject_TypeCheck(o, log_types[k].type)) {
+            *log = log_types[k].get_log(o);
+            return 1;
+        }
+    }
+    return 0;
 }
 
 
@@ -87,8 +140,8 @@ get_log_from_object(PyObject *o, int *perror)
 
     *perror = 0;
 
-    if (PyLogFloat_Check(o)) {
-        return ((PyLogFloat *) o)->log;
+    if (get_log_if_log_type(o, &value)) {
+        return value;
     }
     value = PyFloat_AsDouble(o);
     if (value == -1.0 && PyErr_Occurred()) {
@@ -147,8 +200,7 @@ PyLogFloat_init(PyLogFloat *self, PyObject *args, PyObject *kwds)
     }
 
     // Got a single positional argument.
-    if (PyLogFloat_Check(arg)) {
-        self->log = ((PyLogFloat *) arg)->log;
+    if (get_log_if_log_type(arg, &self->log)) {
         return 0;
     }
 
@@ -229,10 +281,7 @@ PyLogFloat_richcompare(PyObject* a, PyObject* b, int op)
 {
     double b_log;
 
-    if (PyLogFloat_Check(b)) {
-        b_log = ((PyLogFloat *) b)->log;
-    }
-    else {
+    if (!get_log_if_log_type(b, &b_log)) {
         double b_value;
         b_value = PyFloat_AsDouble(b);
         if (b_value == -1.0 && PyErr_Occurred()) {
@@ -398,8 +447,32 @@ PyLogFloat_conj(PyLogFloat *self, PyObject *Py_UNUSED(ignored))
 }
 
 
+//
+// Pickle support.  A logfloat is pickled as logfloat() plus the state
+// self.log, which __setstate__ restores.
+//
+
+static PyObject *
+PyLogFloat_reduce(PyLogFloat *self, PyObject *Py_UNUSED(ignored))
+{
+    return Py_BuildValue("(O()d)", Py_TYPE(self), self->log);
+}
+
+static PyObject *
+PyLogFloat_setstate(PyLogFloat *self, PyObject *state)
+{
+    double logvalue = PyFloat_AsDouble(state);
+    if (logvalue == -1.0 && PyErr_Occurred()) {
+        return NULL;
+    }
+    self->log = logvalue;
+    Py_RETURN_NONE;
+}
+
 static PyMethodDef PyLogFloat_methods[] = {
     {"conjugate", (PyCFunction) PyLogFloat_conj, METH_NOARGS, "complex conjugate"},
+    {"__reduce__", (PyCFunction) PyLogFloat_reduce, METH_NOARGS, "pickle support"},
+    {"__setstate__", (PyCFunction) PyLogFloat_setstate, METH_O, "pickle support"},
     {NULL}  /* Sentinel */
 };
 
@@ -428,7 +501,7 @@ static PyNumberMethods PyLogFloat_as_number = {
 //
 static PyTypeObject PyLogFloat_Type = {
     PyVarObject_HEAD_INIT(NULL, 0)
-    .tp_name        = "logfloat",
+    .tp_name        = "numtypes.logfloat",
     .tp_doc         = DOC_LOGFLOAT,
     .tp_basicsize   = sizeof(PyLogFloat),
     .tp_repr        = PyLogFloat_str,
@@ -451,35 +524,49 @@ PyMethodDef module_methods[] = {
     {0} // sentinel
 };
 
+static NumTypes_PyLogFloat_API pylogfloat_api = {
+    .logfloat_type      = &PyLogFloat_Type,
+    .register_log_type  = register_log_type,
+};
+
+static int
+python_logtypes_exec(PyObject *module)
+{
+    if (PyType_Ready(&PyLogFloat_Type) < 0) {
+        return -1;
+    }
+    if (numtypes_module_add(module, "logfloat",
+                            (PyObject *) &PyLogFloat_Type) < 0) {
+        return -1;
+    }
+
+    PyObject *capi = PyCapsule_New(&pylogfloat_api,
+                                   NUMTYPES_PYLOGFLOAT_CAPSULE, NULL);
+    if (capi == NULL) {
+        return -1;
+    }
+    int status = numtypes_module_add(module, "_C_API", capi);
+    Py_DECREF(capi);
+    return status;
+}
+
+
+static PyModuleDef_Slot module_slots[] = {
+    NUMTYPES_MODULE_SLOTS(python_logtypes_exec)
+};
+
 static struct PyModuleDef moduledef = {
     .m_base     = PyModuleDef_HEAD_INIT,
     .m_name     = "_python_logtypes",
     .m_doc      = "Module that defines the logfloat object",
-    .m_size     = -1,
+    .m_size     = 0,
     .m_methods  = module_methods,  // XXX Not needed?
+    .m_slots    = module_slots,
 };
 
 
 PyMODINIT_FUNC
 PyInit__python_logtypes(void)
 {
-    PyObject *module;
-
-    if (PyType_Ready(&PyLogFloat_Type) < 0) {
-        return NULL;
-    }
-
-    module = PyModule_Create(&moduledef);
-    if (module == NULL) {
-        return NULL;
-    }
-
-    Py_INCREF(&PyLogFloat_Type);
-    if (PyModule_AddObject(module, "logfloat", (PyObject*) &PyLogFloat_Type) < 0) {
-        Py_DECREF(&PyLogFloat_Type);
-        Py_DECREF(module);
-        return NULL;
-    };
-
-    return module;
+    return PyModuleDef_Init(&moduledef);
 }
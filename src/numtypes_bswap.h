@@ -0,0 +1,135 @@
+//
+//  Byte swapping utilities shared by the numtypes extension modules.
+//
+//  These are used to implement the copyswap and copyswapn functions of
+//  the dtypes, and by getitem, setitem and nonzero to handle arrays whose
+//  descriptor is not in native byte order (e.g. the dtype created by
+//  np.dtype(nint32).newbyteorder('>')).
+//
+//  numpy/arrayobject.h must be included before this file.
+//
+
+#ifndef NUMTYPES_BSWAP_H
+#define NUMTYPES_BSWAP_H
+
+#include <stdint.h>
+#include <string.h>
+
+#if defined(_MSC_VER)
+#include <stdlib.h>
+#endif
+
+
+static inline uint16_t
+numtypes_bswap16(uint16_t x)
+{
+#if defined(__GNUC__) || defined(__clang__)
+    return __builtin_bswap16(x);
+#elif defined(_MSC_VER)
+    return _byteswap_ushort(x);
+#else
+    return (uint16_t) ((x << 8) | (x >> 8));
+#endif
+}
+
+static inline uint32_t
+numtypes_bswap32(uint32_t x)
+{
+#if defined(__GNUC__) || defined(__clang__)
+    return __builtin_bswap32(x);
+#elif defined(_MSC_VER)
+    return _byteswap_ulong(x);
+#else
+    return ((x & 0x000000FFu) << 24) | ((x & 0x0000FF00u) << 8)
+         | ((x & 0x00FF0000u) >> 8)  | ((x & 0xFF000000u) >> 24);
+#endif
+}
+
+static inline uint64_t
+numtypes_bswap64(uint64_t x)
+{
+#if defined(__GNUC__) || defined(__clang__)
+    return __builtin_bswap64(x);
+#elif defined(_MSC_VER)
+    return _byteswap_uint64(x);
+#else
+    return ((uint64_t) numtypes_bswap32((uint32_t) x) << 32)
+         | numtypes_bswap32((uint32_t) (x >> 32));
+#endif
+}
+
+//
+// Copy the n values of size `size` (2, 4 or 8) from src to dst, reversing
+// the bytes of each value.  The values are accessed with memcpy, so the
+// data does not have to be aligned, and src may be the same as dst.
+// When both strides equal `size`, the loops are simple enough for the
+// compiler to vectorize them (e.g. with byte shuffle instructions).
+//
+
+#define NUMTYPES_BYTESWAPN(nbits) \
+    static inline void \
+    numtypes_byteswapn_##nbits(char *dst, npy_intp dstride, \
+                               const char *src, npy_intp sstride, npy_intp n) \
+    { \
+        uint##nbits##_t v; \
+        if (dstride == sizeof(v) && sstride == sizeof(v)) { \
+            for (npy_intp i = 0; i < n; ++i) { \
+                memcpy(&v, src + i*sizeof(v), sizeof(v)); \
+                v = numtypes_bswap##nbits(v); \
+                memcpy(dst + i*sizeof(v), &v, sizeof(v)); \
+            } \
+        } \
+        else { \
+            for (npy_intp i = 0; i < n; ++i) { \
+                memcpy(&v, src, sizeof(v)); \
+                v = numtypes_bswap##nbits(v); \
+                memcpy(dst, &v, sizeof(v)); \
+                dst += dstride; \
+                src += sstride; \
+            } \
+        } \
+    }
+
+NUMTYPES_BYTESWAPN(16)
+NUMTYPES_BYTESWAPN(32)
+NUMTYPES_BYTESWAPN(64)
+
+static inline void
+numtypes_byteswapn(void *dst, npy_intp dstride,
+                   const void *src, npy_intp sstride,
+                   npy_intp n, size_t size)
+{
+    switch (size) {
+        case 2:
+            numtypes_byteswapn_16((char *) dst, dstride, (const char *) src, sstride, n);
+            break;
+        case 4:
+            numtypes_byteswapn_32((char *) dst, dstride, (const char *) src, sstride, n);
+            break;
+        case 8:
+            numtypes_byteswapn_64((char *) dst, dstride, (const char *) src, sstride, n);
+            break;
+    }
+}
+
+//
+// Copy one value of size `size` (2, 4 or 8) from src to dst, reversing
+// its bytes.
+//
+static inline void
+numtypes_byteswap(void *dst, const void *src, size_t size)
+{
+    numtypes_byteswapn(dst, 0, src, 0, 1, size);
+}
+
+//
+// Nonzero if the data of `arr` is not in native byte order.  `arr` is the
+// array argument of a PyArray_ArrFuncs function, and it may be NULL.
+//
+static inline int
+numtypes_isbyteswapped(void *arr)
+{
+    return arr != NULL && PyArray_ISBYTESWAPPED((PyArrayObject *) arr);
+}
+
+#endif
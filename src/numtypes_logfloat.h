@@ -0,0 +1,66 @@
+//
+//  The Python logfloat object, shared by the _python_logtypes module (which
+//  defines the type) and the _logtypes module (whose scalar types and NumPy
+//  dtypes convert to and from logfloat).
+//
+//  _python_logtypes does not import NumPy, so it can't know about the
+//  logfloat16, logfloat32 and logfloat64 scalars.  Instead, it exports the
+//  NumTypes_PyLogFloat_API struct in the capsule named by
+//  NUMTYPES_PYLOGFLOAT_CAPSULE, and _logtypes and _slogtypes register
+//  their scalar types with register_log_type when they are imported.  Both
+//  directions then copy the log: neither exp() nor log() is computed, so
+//  values outside the range of float (e.g. logfloat(log=-1000)) are
+//  converted exactly.
+//
+//  The struct is internal to numtypes; it is not part of the C API in
+//  numtypes/numtypes_api.h.
+//
+
+#ifndef NUMTYPES_LOGFLOAT_H
+#define NUMTYPES_LOGFLOAT_H
+
+#include <Python.h>
+
+typedef struct {
+    PyObject_HEAD
+    double log;  // The natural log of the value.
+} PyLogFloat;
+
+#define NUMTYPES_PYLOGFLOAT_CAPSULE "numtypes._python_logtypes._C_API"
+
+typedef struct {
+    // The type of the Python logfloat objects.
+    PyTypeObject *logfloat_type;
+    // Register a type whose instances hold the log of a value.  logfloat
+    // gets the log of an instance of type (or of a subtype) with get_log
+    // wherever it accepts a number.  Returns 0 on success, or -1 with an
+    // exception set.
+    int (*register_log_type)(PyTypeObject *type, double (*get_log)(PyObject *));
+} NumTypes_PyLogFloat_API;
+
+//
+// Import the _python_logtypes module and return the struct in its _C_API
+// capsule.  (PyCapsule_Import can't be used, because the numtypes package
+// doesn't have the submodules as attributes until they are imported.)
+// Returns NULL with an exception set on error.
+//
+static inline NumTypes_PyLogFloat_API *
+numtypes_get_pylogfloat_api(void)
+{
+    PyObject *module = PyImport_ImportModule("numtypes._python_logtypes");
+    if (module == NULL) {
+        return NULL;
+    }
+    PyObject *capi = PyObject_GetAttrString(module, "_C_API");
+    Py_DECREF(module);
+    if (capi == NULL) {
+        return NULL;
+    }
+    // The capsule points to a static struct, so the pointer remains valid
+    // after the capsule is released.
+    void *api = PyCapsule_GetPointer(capi, NUMTYPES_PYLOGFLOAT_CAPSULE);
+    Py_DECREF(capi);
+    return (NumTypes_PyLogFloat_API *) api;
+}
+
+#endif
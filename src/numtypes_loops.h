@@ -0,0 +1,78 @@
+//
+//  The inner loop of the binary ufuncs, shared by the numtypes extension
+//  modules.
+//
+//  NUMTYPES_BINARY_LOOP(tin0, tin1, tout, stmt) is used in the body of a
+//  ufunc inner loop function (it uses the arguments args, dimensions and
+//  steps).  For each element, stmt is executed with the inputs in the
+//  variables in0 (of type tin0) and in1 (tin1), and with the pointer out
+//  (tout *) to the output.  There are specialized loops for the common
+//  layouts:
+//
+//    * all the operands are contiguous; the compiler can vectorize this
+//      loop when stmt is simple (e.g. the sum of the logs in multiply);
+//    * one input is a scalar (stride 0, e.g. a Python scalar or a
+//      broadcast value), and the other input and the output are
+//      contiguous; the scalar is read once, before the loop, so the
+//      compiler can hoist the work in stmt that depends only on it.
+//
+//  Everything else, including reductions (whose output has stride 0), uses
+//  the general strided loop.  Each iteration reads the inputs before it
+//  writes the output, so all the loops are correct for in-place operations
+//  and accumulations (where in0 is the previous output).
+//
+//  numpy/ndarraytypes.h must be included before this file.
+//
+
+#ifndef NUMTYPES_LOOPS_H
+#define NUMTYPES_LOOPS_H
+
+#define NUMTYPES_BINARY_LOOP(tin0, tin1, tout, stmt)                        \
+    do {                                                                    \
+        char *i0_ = args[0];                                                \
+        char *i1_ = args[1];                                                \
+        char *o_ = args[2];                                                 \
+        npy_intp n_ = dimensions[0];                                        \
+        npy_intp is0_ = steps[0];                                           \
+        npy_intp is1_ = steps[1];                                           \
+        npy_intp os_ = steps[2];                                            \
+                                                                            \
+        if (is0_ == sizeof(tin0) && is1_ == sizeof(tin1)                    \
+                && os_ == sizeof(tout)) {                                   \
+            for (npy_intp k_ = 0; k_ < n_; ++k_) {                          \
+                const tin0 in0 = ((tin0 *) i0_)[k_];                        \
+                const tin1 in1 = ((tin1 *) i1_)[k_];                        \
+                tout *out = (tout *) o_ + k_;                               \
+                stmt;                                                       \
+            }                                                               \
+        }                                                                   \
+        else if (is0_ == 0 && is1_ == sizeof(tin1)                          \
+                 && os_ == sizeof(tout)) {                                  \
+            const tin0 in0 = *(tin0 *) i0_;                                 \
+            for (npy_intp k_ = 0; k_ < n_; ++k_) {                          \
+                const tin1 in1 = ((tin1 *) i1_)[k_];                        \
+                tout *out = (tout *) o_ + k_;                               \
+                stmt;                                                       \
+            }                                                               \
+        }                                                                   \
+        else if (is0_ == sizeof(tin0) && is1_ == 0                          \
+                 && os_ == sizeof(tout)) {                                  \
+            const tin1 in1 = *(tin1 *) i1_;                                 \
+            for (npy_intp k_ = 0; k_ < n_; ++k_) {                          \
+                const tin0 in0 = ((tin0 *) i0_)[k_];                        \
+                tout *out = (tout *) o_ + k_;                               \
+                stmt;                                                       \
+            }                                                               \
+        }                                                                   \
+        else {                                                              \
+            for (npy_intp k_ = 0; k_ < n_; ++k_,                            \
+                    i0_ += is0_, i1_ += is1_, o_ += os_) {                  \
+                const tin0 in0 = *(tin0 *) i0_;                             \
+                const tin1 in1 = *(tin1 *) i1_;                             \
+                tout *out = (tout *) o_;                                    \
+                stmt;                                                       \
+            }                                                               \
+        }                                                                   \
+    } while (0)
+
+#endif
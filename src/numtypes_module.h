@@ -0,0 +1,159 @@
+//
+//  Module definition utilities shared by the numtypes extension modules.
+//
+//  The modules use multi-phase initialization (PEP 489).  The types and
+//  NumPy dtypes they define are static and are registered with NumPy once
+//  per process, so the modules declare that they do not support
+//  subinterpreters with their own GIL.  The modules do not rely on the GIL,
+//  so they also declare that they can be used in the free-threaded build
+//  of CPython (PEP 703) without enabling the GIL.
+//
+//  The few global settings that the ufunc and cast loops read (e.g. the
+//  nint32 cast policy) can be changed from any thread while loops run in
+//  other threads, so they are accessed with the atomic functions below.
+//
+
+#ifndef NUMTYPES_MODULE_H
+#define NUMTYPES_MODULE_H
+
+#include <Python.h>
+
+#if defined(_MSC_VER)
+#include <intrin.h>
+#endif
+
+
+// Py_mod_multiple_interpreters was added in Python 3.12, Py_mod_gil in 3.13.
+
+#if defined(Py_mod_multiple_interpreters)
+#define NUMTYPES_MOD_INTERPRETERS_SLOT \
+    {Py_mod_multiple_interpreters, Py_MOD_MULTIPLE_INTERPRETERS_NOT_SUPPORTED},
+#else
+#define NUMTYPES_MOD_INTERPRETERS_SLOT
+#endif
+
+#if defined(Py_mod_gil)
+#define NUMTYPES_MOD_GIL_SLOT {Py_mod_gil, Py_MOD_GIL_NOT_USED},
+#else
+#define NUMTYPES_MOD_GIL_SLOT
+#endif
+
+//
+// The slots of a module whose exec function is `exec_func`.
+//
+#define NUMTYPES_MODULE_SLOTS(exec_func) \
+    {Py_mod_exec, (void *) (exec_func)}, \
+    NUMTYPES_MOD_INTERPRETERS_SLOT \
+    NUMTYPES_MOD_GIL_SLOT \
+    {0, NULL}
+
+//
+// Add obj to the module m, as PyModule_AddObjectRef (Python 3.10+) does:
+// the caller's reference to obj is not stolen.
+//
+static inline int
+numtypes_module_add(PyObject *m, const char *name, PyObject *obj)
+{
+    Py_INCREF(obj);
+    if (PyModule_AddObject(m, name, obj) < 0) {
+        Py_DECREF(obj);
+        return -1;
+    }
+    return 0;
+}
+
+//
+// Relaxed atomic access to an int setting.  Only the value itself has to
+// be consistent; the settings do not order any other memory accesses.
+//
+
+static inline int
+numtypes_atomic_load_int(int *p)
+{
+#if defined(__GNUC__) || defined(__clang__)
+    return __atomic_load_n(p, __ATOMIC_RELAXED);
+#else
+    return *(volatile int *) p;
+#endif
+}
+
+//
+// Store value in *p and return the previous value.
+//
+static inline int
+numtypes_atomic_exchange_int(int *p, int value)
+{
+#if defined(__GNUC__) || defined(__clang__)
+    return __atomic_exchange_n(p, value, __ATOMIC_RELAXED);
+#elif defined(_MSC_VER)
+    return (int) _InterlockedExchange((volatile long *) p, (long) value);
+#else
+    int old = *(volatile int *) p;
+    *(volatile int *) p = value;
+    return old;
+#endif
+}
+
+//
+// A global setting whose value is one of a few names, such as the
+// precision of the logfloat add loops.  The value is the index of the name
+// in names; the ufunc and cast loops read it with numtypes_setting_value.
+// numtypes_setting_get and numtypes_setting_set implement the Python
+// get_...() and set_...(name) functions (set returns the previous name).
+//
+typedef struct {
+    int value;
+    const char *what;           // What the setting is, e.g. "precision".
+    const char *const *names;
+    int num_names;
+} numtypes_setting;
+
+#define NUMTYPES_SETTING(what, names, default_value) \
+    {(default_value), (what), (names), sizeof(names)/sizeof((names)[0])}
+
+static inline int
+numtypes_setting_value(numtypes_setting *setting)
+{
+    return numtypes_atomic_load_int(&setting->value);
+}
+
+static inline PyObject *
+numtypes_setting_get(numtypes_setting *setting)
+{
+    return PyUnicode_FromString(
+                setting->names[numtypes_setting_value(setting)]);
+}
+
+static inline PyObject *
+numtypes_setting_set(numtypes_setting *setting, PyObject *arg)
+{
+    if (PyUnicode_Check(arg)) {
+        const char *name = PyUnicode_AsUTF8(arg);
+        if (name == NULL) {
+            return NULL;
+        }
+        for (int k = 0; k < setting->num_names; ++k) {
+            if (strcmp(name, setting->names[k]) == 0) {
+                int old = numtypes_atomic_exchange_int(&setting->value, k);
+                return PyUnicode_FromString(setting->names[old]);
+            }
+        }
+    }
+
+    // The error message lists the names: "... must be one of 'a', 'b'".
+    PyObject *list = PyUnicode_FromString("");
+    for (int k = 0; list != NULL && k < setting->num_names; ++k) {
+        PyObject *tmp = PyUnicode_FromFormat("%U%s'%s'", list,
+                                             k == 0 ? "" : ", ",
+                                             setting->names[k]);
+        Py_SETREF(list, tmp);
+    }
+    if (list != NULL) {
+        PyErr_Format(PyExc_ValueError, "%s must be one of %U, not %R",
+                     setting->what, list, arg);
+        Py_DECREF(list);
+    }
+    return NULL;
+}
+
+#endif
@@ -0,0 +1,192 @@
+//
+//  Text parsing utilities shared by the numtypes extension modules.
+//
+//  These are used to implement the fromstr and scanfunc functions of the
+//  dtypes (which np.fromstring and np.fromfile use when `sep` is given),
+//  and to convert str items in setitem (which is how np.loadtxt fills an
+//  array of a user-defined dtype).  They can be called without the GIL
+//  (NumPy calls fromstr and scanfunc without it); numtypes_parse_double
+//  acquires the GIL for PyOS_string_to_double.
+//
+
+#ifndef NUMTYPES_TEXT_H
+#define NUMTYPES_TEXT_H
+
+#include <Python.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+// The longest token read by numtypes_scan_token (including the '\0').
+#define NUMTYPES_TOKEN_SIZE 128
+
+
+static inline int
+numtypes_isspace(int c)
+{
+    return c == ' ' || c == '\t' || c == '\n' || c == '\r'
+           || c == '\f' || c == '\v';
+}
+
+static inline const char *
+numtypes_skip_space(const char *s)
+{
+    while (numtypes_isspace(*s)) {
+        ++s;
+    }
+    return s;
+}
+
+//
+// If the text at s starts with prefix (ignoring case), return a pointer to
+// the character after it; otherwise return NULL.  prefix must be lower case.
+//
+static inline const char *
+numtypes_match_prefix(const char *s, const char *prefix)
+{
+    for (; *prefix != '\0'; ++s, ++prefix) {
+        if (*s == '\0' || (*s | 0x20) != *prefix) {
+            return NULL;
+        }
+    }
+    return s;
+}
+
+//
+// Parse a floating point number at s (after optional whitespace) with
+// PyOS_string_to_double, as Python's float() does.  Unlike strtod, it
+// doesn't depend on the locale: the decimal point is always '.'.  "nan",
+// "inf" and "infinity" (in any case) are accepted, and values that are
+// too big are parsed as +/-inf.  On success, 0 is returned and *end points
+// to the character after the number.  If there is no number at s, -1 is
+// returned.
+//
+static inline int
+numtypes_parse_double(const char *s, const char **end, double *value)
+{
+    char *e;
+    s = numtypes_skip_space(s);
+    PyGILState_STATE gil = PyGILState_Ensure();
+    *value = PyOS_string_to_double(s, &e, NULL);
+    if (e == s) {
+        // PyOS_string_to_double raised ValueError.
+        PyErr_Clear();
+    }
+    PyGILState_Release(gil);
+    if (e == s) {
+        return -1;
+    }
+    *end = e;
+    return 0;
+}
+
+//
+// Parse a complex number at s (after optional whitespace) in one of the
+// forms accepted by Python's complex(): "x", "yj", "x+yj" or "x-yj",
+// optionally in parentheses.  The imaginary coefficient may be omitted,
+// as in "1+j".  On success, *x, *y and *end are set and 0 is returned;
+// if there is no complex number at s, -1 is returned.
+//
+static inline int
+numtypes_parse_complex(const char *s, const char **end, double *x, double *y)
+{
+    const char *p = numtypes_skip_space(s);
+    const char *e;
+    double a, b;
+    int paren = (*p == '(');
+
+    if (paren) {
+        p = numtypes_skip_space(p + 1);
+    }
+    if (numtypes_parse_double(p, &e, &a) == 0) {
+        p = e;
+        if ((*p | 0x20) == 'j') {
+            *x = 0.0;
+            *y = a;
+            ++p;
+        }
+        else if (*p == '+' || *p == '-') {
+            if (numtypes_parse_double(p, &e, &b) == 0 && (*e | 0x20) == 'j') {
+                p = e + 1;
+            }
+            else if ((p[1] | 0x20) == 'j') {
+                b = (*p == '-') ? -1.0 : 1.0;
+                p += 2;
+            }
+            else {
+                return -1;
+            }
+            *x = a;
+            *y = b;
+        }
+        else {
+            *x = a;
+            *y = 0.0;
+        }
+    }
+    else {
+        // "j", "+j" or "-j".
+        b = 1.0;
+        if (*p == '+' || *p == '-') {
+            b = (*p == '-') ? -1.0 : 1.0;
+            ++p;
+        }
+        if ((*p | 0x20) != 'j') {
+            return -1;
+        }
+        ++p;
+        *x = 0.0;
+        *y = b;
+    }
+    if (paren) {
+        p = numtypes_skip_space(p);
+        if (*p != ')') {
+            return -1;
+        }
+        ++p;
+    }
+    *end = p;
+    return 0;
+}
+
+static inline int
+numtypes_istokenchar(int c)
+{
+    return (c >= '0' && c <= '9') || ((c | 0x20) >= 'a' && (c | 0x20) <= 'z')
+           || c == '+' || c == '-' || c == '.' || c == '=';
+}
+
+//
+// Read the next token from fp into buf, which must have size
+// NUMTYPES_TOKEN_SIZE.  Leading whitespace is skipped; the token is the
+// run of characters that can occur in the text form of a value (letters,
+// digits and "+-.=").  The character that ends the token is pushed back.
+// Returns the length of the token (0 if the next character can't start
+// a token, or if the token is too long), or EOF at the end of the file.
+//
+static inline int
+numtypes_scan_token(FILE *fp, char *buf)
+{
+    int c;
+    int n = 0;
+
+    do {
+        c = getc(fp);
+    } while (c != EOF && numtypes_isspace(c));
+    if (c == EOF) {
+        return EOF;
+    }
+    while (c != EOF && numtypes_istokenchar(c)) {
+        if (n == NUMTYPES_TOKEN_SIZE - 1) {
+            return 0;
+        }
+        buf[n++] = (char) c;
+        c = getc(fp);
+    }
+    if (c != EOF) {
+        ungetc(c, fp);
+    }
+    buf[n] = '\0';
+    return n;
+}
+
+#endif